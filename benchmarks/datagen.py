@@ -0,0 +1,283 @@
+# benchmarks/datagen.py
+"""
+Deterministic, production-scale synthetic data for benchmarks.
+
+Fills a database with users, a menu (init_db's sample items plus generated
+variants), orders with time-of-day / weekday seasonality and a growth trend,
+basket sizes skewed towards 1-3 items, open carts, login attempts and audit
+logs. Rows are written with Core executemany inserts in chunks; the sales
+rollups are rebuilt at the end. Same seed + same end date = same data.
+
+    python -m benchmarks.datagen --users 20000 --orders 1000000 --seed 42
+    python -m benchmarks.datagen --database-url sqlite:///bench.db --end-date 2026-01-31
+
+Every generated user logs in with BENCH_PASSWORD.
+"""
+import sys
+import time
+import random
+import argparse
+from datetime import datetime, date, timedelta
+import bcrypt
+from sqlalchemy import create_engine, select, func, insert
+from sqlalchemy.orm import Session
+from core.db import engine as app_engine
+from core.migrations import upgrade
+from core.rollup_service import rebuild_rollups
+from init_db import seed_food_items
+from models.user import User
+from models.food_item import FoodItem
+from models.order import Order, OrderItem
+from models.cart import Cart
+from models.login_attempt import LoginAttempt
+from models.audit_log import AuditLog
+
+BENCH_PASSWORD = "password123"
+# Fixed salt so the generated hash (and so the whole dataset) is reproducible
+_BENCH_SALT = b"$2b$12$PojangmachaBenchSalt0."
+
+# Relative order volume by hour of day (lunch and dinner peaks) and weekday (Mon=0)
+HOUR_WEIGHTS = [1, 0.5, 0.3, 0.2, 0.2, 0.4, 1, 2, 3, 4, 6, 10, 12, 9, 5, 4, 5, 9, 12, 11, 8, 5, 3, 2]
+WEEKDAY_WEIGHTS = [0.8, 0.8, 0.9, 1.0, 1.3, 1.5, 1.2]
+BASKET_SIZES = [1, 2, 3, 4, 5, 6, 8]
+BASKET_WEIGHTS = [35, 28, 18, 10, 5, 3, 1]
+QUANTITY_WEIGHTS = [80, 15, 5]  # quantity 1, 2, 3
+EXTRA_MENU_CATEGORIES = ["Korean Bowls", "Noodles", "Combo", "Toppings", "Drinks", "Snacks", "Desserts"]
+# Generated item names (flavour x dish) so menu search has realistic words to match
+MENU_FLAVOURS = ["Spicy", "Garlic", "Cheesy", "Honey", "Kimchi", "Soy", "Yangnyeom", "Sesame",
+                 "Gochujang", "Truffle", "Curry", "Black Bean"]
+MENU_DISHES = ["Ramyun", "Tteokbokki", "Bibimbap", "Fried Chicken", "Kimbap", "Japchae", "Mandu",
+               "Bulgogi Bowl", "Odeng", "Hotteok", "Jjajangmyeon", "Bingsu"]
+
+
+def _next_id(conn, model):
+    return (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def _insert_chunks(conn, model, rows, chunk_size):
+    """executemany in chunks; rows may be a generator"""
+    chunk, total = [], 0
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            conn.execute(insert(model), chunk)
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        conn.execute(insert(model), chunk)
+        total += len(chunk)
+    return total
+
+
+def _generated_name(food_id):
+    flavour = MENU_FLAVOURS[food_id % len(MENU_FLAVOURS)]
+    dish = MENU_DISHES[(food_id // len(MENU_FLAVOURS)) % len(MENU_DISHES)]
+    return f"{flavour} {dish} #{food_id}"
+
+
+def _menu(conn, rng, menu_size):
+    """(id, price) for every menu item, topping the sample menu up to `menu_size` items"""
+    existing = conn.execute(select(FoodItem.id, FoodItem.price).order_by(FoodItem.id)).all()
+    next_id = _next_id(conn, FoodItem)
+    extra = [
+        {
+            "id": next_id + i,
+            "name": _generated_name(next_id + i),
+            "description": f"{rng.choice(EXTRA_MENU_CATEGORIES)} special. Generated menu item.",
+            "category": rng.choice(EXTRA_MENU_CATEGORIES),
+            "price": float(rng.randrange(40, 450, 5)),
+            "image": None,
+        }
+        for i in range(max(0, menu_size - len(existing)))
+    ]
+    if extra:
+        conn.execute(insert(FoodItem), extra)
+    return [(row[0], row[1]) for row in existing] + [(row["id"], row["price"]) for row in extra]
+
+
+def _day_weights(days, end_date):
+    """Weight per day, oldest first: weekday seasonality times a linear growth trend"""
+    start = end_date - timedelta(days=days - 1)
+    return start, [
+        WEEKDAY_WEIGHTS[(start + timedelta(days=d)).weekday()] * (0.5 + d / days)
+        for d in range(days)
+    ]
+
+
+def _orders_per_day(total, weights):
+    """Split `total` orders over the days proportionally, carrying the rounding remainder"""
+    scale = total / sum(weights)
+    counts, carry = [], 0.0
+    for w in weights:
+        exact = w * scale + carry
+        counts.append(int(exact))
+        carry = exact - int(exact)
+    counts[-1] += total - sum(counts)
+    return counts
+
+
+def generate(engine=None, users=20000, orders=1_000_000, days=365, menu_size=60,
+             seed=42, end_date=None, chunk_size=20000, verbose=True):
+    """
+    Append a synthetic dataset to `engine` (default: the app database).
+    Returns a summary dict with row counts and elapsed seconds.
+    """
+    engine = engine or app_engine
+    end_date = end_date or datetime.utcnow().date()
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    log = print if verbose else (lambda *a, **k: None)
+
+    with Session(bind=engine) as db:
+        upgrade(db)
+        seed_food_items(db)
+
+    counts = {}
+    with engine.begin() as conn:
+        menu = _menu(conn, rng, menu_size)
+        # Popularity: a few items sell far more than the rest
+        popularity = [1 / (rank + 1) ** 0.9 for rank in range(len(menu))]
+        rng.shuffle(popularity)
+        menu_cum = []
+        acc = 0.0
+        for w in popularity:
+            acc += w
+            menu_cum.append(acc)
+
+        first_user = _next_id(conn, User)
+        password_hash = bcrypt.hashpw(BENCH_PASSWORD.encode("utf-8"), _BENCH_SALT).decode("utf-8")
+        signup_start = datetime.combine(end_date - timedelta(days=days), datetime.min.time())
+        counts["users"] = _insert_chunks(conn, User, (
+            {
+                "id": first_user + i,
+                "full_name": f"Bench User {first_user + i}",
+                "email": f"user{first_user + i}@bench.pojangmacha.test",
+                "password_hash": password_hash,
+                "phone": f"09{rng.randrange(10**9):09d}",
+                "role": "customer",
+                "two_fa_enabled": False,
+                "created_at": signup_start + timedelta(seconds=rng.randrange(days * 86400)),
+            }
+            for i in range(users)
+        ), chunk_size)
+        log(f"   users: {counts['users']}")
+
+    user_ids = list(range(first_user, first_user + users))
+    # Activity follows a long tail: a minority of customers place most orders
+    activity_cum = []
+    acc = 0.0
+    for _ in user_ids:
+        acc += rng.paretovariate(1.5)
+        activity_cum.append(acc)
+
+    # Orders + items, one transaction per chunk of days so no single write is huge
+    start_day, weights = _day_weights(days, end_date)
+    per_day = _orders_per_day(orders, weights)
+    pending_after = datetime.combine(end_date - timedelta(days=1), datetime.min.time())
+    with engine.connect() as conn:
+        order_id, item_id = _next_id(conn, Order), _next_id(conn, OrderItem)
+    counts["orders"] = counts["order_items"] = 0
+    order_rows, item_rows = [], []
+
+    def flush():
+        with engine.begin() as conn:
+            conn.execute(insert(Order), order_rows)
+            conn.execute(insert(OrderItem), item_rows)
+        counts["orders"] += len(order_rows)
+        counts["order_items"] += len(item_rows)
+        order_rows.clear()
+        item_rows.clear()
+
+    for d, n in enumerate(per_day):
+        day_start = datetime.combine(start_day + timedelta(days=d), datetime.min.time())
+        hours = rng.choices(range(24), weights=HOUR_WEIGHTS, k=n)
+        stamps = sorted(day_start + timedelta(hours=h, seconds=rng.randrange(3600)) for h in hours)
+        buyers = rng.choices(user_ids, cum_weights=activity_cum, k=n)
+        for created_at, user_id in zip(stamps, buyers):
+            basket = {}
+            for food_index in rng.choices(range(len(menu)), cum_weights=menu_cum,
+                                          k=rng.choices(BASKET_SIZES, weights=BASKET_WEIGHTS)[0]):
+                basket[food_index] = basket.get(food_index, 0) + rng.choices((1, 2, 3), weights=QUANTITY_WEIGHTS)[0]
+            total = 0.0
+            for food_index, quantity in basket.items():
+                food_id, price = menu[food_index]
+                item_rows.append({"id": item_id, "order_id": order_id, "food_id": food_id,
+                                  "quantity": quantity, "subtotal": price * quantity})
+                total += price * quantity
+                item_id += 1
+            if created_at >= pending_after:
+                status = rng.choices(("Pending", "Completed"), weights=(70, 30))[0]
+            else:
+                status = rng.choices(("Completed", "Cancelled"), weights=(94, 6))[0]
+            order_rows.append({"id": order_id, "user_id": user_id, "total_price": total,
+                               "status": status, "created_at": created_at})
+            order_id += 1
+        if len(order_rows) >= chunk_size:
+            flush()
+            log(f"   orders: {counts['orders']} / {orders}")
+    if order_rows:
+        flush()
+    log(f"   orders: {counts['orders']}, order items: {counts['order_items']}")
+
+    end_dt = datetime.combine(end_date, datetime.min.time())
+    with engine.begin() as conn:
+        # Open carts for ~10% of users, one row per (user, food)
+        cart_id = _next_id(conn, Cart)
+        cart_rows = []
+        for user_id in rng.sample(user_ids, k=users // 10):
+            for food_index in set(rng.choices(range(len(menu)), cum_weights=menu_cum, k=rng.randint(1, 4))):
+                cart_rows.append({"id": cart_id, "user_id": user_id, "food_id": menu[food_index][0],
+                                  "quantity": rng.choices((1, 2, 3), weights=QUANTITY_WEIGHTS)[0],
+                                  "created_at": end_dt - timedelta(seconds=rng.randrange(7 * 86400))})
+                cart_id += 1
+        counts["carts"] = _insert_chunks(conn, Cart, cart_rows, chunk_size)
+
+        # Roughly one login per 5 orders, ~8% failed (some for unknown emails)
+        counts["login_attempts"] = _insert_chunks(conn, LoginAttempt, (
+            {
+                "email": (f"user{rng.choice(user_ids)}@bench.pojangmacha.test"
+                          if rng.random() > 0.02 else f"unknown{rng.randrange(10**6)}@example.com"),
+                "success": rng.random() > 0.08,
+                "attempt_time": end_dt - timedelta(seconds=rng.randrange(days * 86400)),
+                "failed_attempts": 0,
+            }
+            for _ in range(orders // 5)
+        ), chunk_size)
+
+        counts["audit_logs"] = _insert_chunks(conn, AuditLog, (
+            {
+                "user_email": "admin@gmail.com",
+                "action": f"Updated order #{rng.randrange(1, order_id)} to {rng.choice(('Completed', 'Cancelled'))}",
+                "timestamp": end_dt - timedelta(seconds=rng.randrange(days * 86400)),
+            }
+            for _ in range(orders // 20)
+        ), chunk_size)
+    log(f"   carts: {counts['carts']}, login attempts: {counts['login_attempts']}, audit logs: {counts['audit_logs']}")
+
+    with Session(bind=engine) as db:
+        rebuild_rollups(db)
+    counts["seconds"] = round(time.perf_counter() - started, 1)
+    return counts
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Fill a database with deterministic synthetic data")
+    parser.add_argument("--database-url", help="target database (default: DATABASE_URL)")
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--menu-size", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--end-date", type=date.fromisoformat, help="last day with orders, YYYY-MM-DD (default: today)")
+    parser.add_argument("--chunk-size", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    target = create_engine(args.database_url, future=True) if args.database_url else app_engine
+    print(f"Generating data (seed {args.seed})...")
+    counts = generate(target, users=args.users, orders=args.orders, days=args.days, menu_size=args.menu_size,
+                      seed=args.seed, end_date=args.end_date, chunk_size=args.chunk_size)
+    print(f"Done in {counts.pop('seconds')}s: " + ", ".join(f"{k}={v}" for k, v in counts.items()))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
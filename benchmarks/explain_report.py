@@ -0,0 +1,193 @@
+# benchmarks/explain_report.py
+"""
+EXPLAIN QUERY PLAN report for the app's hot query paths.
+
+Each case below runs a service call (or the query a view issues) against a
+scratch SQLite database built from the model metadata, captures the SQL it
+emits, and prints SQLite's plan for every SELECT / UPDATE / DELETE.
+
+    python -m benchmarks.explain_report          # plans on the scratch schema
+    python -m benchmarks.explain_report --live   # same SQL, planned on DATABASE_URL
+
+A plan line "SCAN <table>" without an index is a full table scan. Cases list
+the tables they may scan (whole-history aggregates, rollup tables); any other
+full scan is reported as a problem and the script exits with status 1.
+"""
+import sys
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from core.db import Base, engine as live_engine
+from core import cart_service, checkout_service, lockout_service, rollup_service, analytics_service, order_service
+from core import admin_order_service
+from core.session_manager import check_any_active_lockout
+from core.catalog_cache import load_catalog
+from core.menu_search import install_menu_search, search_menu
+from models.user import User
+from models.food_item import FoodItem
+from models.cart import Cart
+from models.order import Order, OrderItem
+from models.login_attempt import LoginAttempt
+import models.audit_log  # noqa: F401  (registers the table)
+import models.sales_rollup  # noqa: F401
+
+ROLLUP_TABLES = ("sales_daily", "sales_hourly", "sales_by_item")
+
+# (name, call, tables allowed to be fully scanned)
+CASES = [
+    ("auth: user by email",
+     lambda db: db.query(User).filter(User.email == "customer@example.com").first(), ()),
+    ("cart: get_user_cart", lambda db: cart_service.get_user_cart(db, 1), ()),
+    ("cart: get_cart_summary", lambda db: cart_service.get_cart_summary(db, 1), ()),
+    ("cart: add_to_cart", lambda db: cart_service.add_to_cart(db, 1, 2), ()),
+    ("cart: update_cart_quantity", lambda db: cart_service.update_cart_quantity(db, 1, 3), ()),
+    ("cart: remove_from_cart", lambda db: cart_service.remove_from_cart(db, 1), ()),
+    ("cart: apply_cart_deltas", lambda db: cart_service.apply_cart_deltas(db, 1, {2: 1, 3: -1}), ()),
+    ("cart: get_cart_count", lambda db: cart_service.get_cart_count(db, 1), ()),
+    ("menu: items by category",
+     lambda db: db.query(FoodItem).filter(FoodItem.category == "Ramen").all(), ()),
+    ("menu: search_menu (FTS5)", lambda db: search_menu(db, "spicy ram"), ()),
+    ("checkout: food by name",
+     lambda db: db.query(FoodItem).filter(FoodItem.name == "Shin Ramyun").first(), ()),
+    ("checkout: order by checkout token",
+     lambda db: checkout_service.get_order_by_checkout_token(db, 1, "token"), ()),
+    ("cart: clear_user_cart", lambda db: cart_service.clear_user_cart(db, 1), ()),
+    ("lockout: get_global_failed_attempts", lockout_service.get_global_failed_attempts, ()),
+    ("lockout: get_global_lockout", lockout_service.get_global_lockout, ()),
+    ("lockout: check_any_active_lockout", check_any_active_lockout, ()),
+    ("lockout: clear_global_lockout", lockout_service.clear_global_lockout, ()),
+    ("order history: first page", lambda db: order_service.get_order_page(db, 1), ()),
+    ("order history: next page",
+     lambda db: order_service.get_order_page(db, 1, after=(datetime.utcnow() + timedelta(days=1), 2)), ()),
+    ("admin orders: first page", lambda db: admin_order_service.list_orders(db), ()),
+    ("admin orders: next page",
+     lambda db: admin_order_service.list_orders(db, after=(datetime.utcnow() + timedelta(days=1), 2)), ()),
+    ("admin orders: by status and date",
+     lambda db: admin_order_service.list_orders(db, status="Pending", date_from=datetime.utcnow() - timedelta(days=7),
+                                                date_to=datetime.utcnow() + timedelta(days=1)), ()),
+    ("admin orders: by customer", lambda db: admin_order_service.list_orders(db, customer="custom"), ("users",)),
+    ("admin orders: update_order_status",
+     lambda db: admin_order_service.update_order_status(db, 1, "Completed", "admin@example.com"), ROLLUP_TABLES),
+    ("rollups: record_order", lambda db: rollup_service.record_order(db, db.get(Order, 1)), ()),
+    ("rollups: remove_orders", lambda db: rollup_service.remove_orders(db, [db.get(Order, 1)]),
+     ROLLUP_TABLES),
+    ("analytics: sales trends", lambda db: analytics_service.get_sales_trends.uncached(db), ()),
+    ("analytics: best sellers", lambda db: analytics_service.get_best_selling_items.uncached(db),
+     ("sales_by_item",)),
+    ("analytics: revenue by category", lambda db: analytics_service.get_revenue_by_category.uncached(db),
+     ("sales_by_item",)),
+    ("analytics: hourly pattern", lambda db: analytics_service.get_hourly_sales_pattern.uncached(db),
+     ("sales_hourly",)),
+    ("analytics: inventory alerts", lambda db: analytics_service.get_inventory_alerts.uncached(db),
+     ("sales_by_item", "food_items")),
+    ("analytics: customer frequency", lambda db: analytics_service.get_customer_order_frequency.uncached(db),
+     ("users",)),
+    ("analytics: dashboard summary", lambda db: analytics_service.get_dashboard_summary.uncached(db),
+     ("orders", "users")),
+]
+
+
+def _seed(db: Session):
+    """A handful of rows so every case has something to hit"""
+    now = datetime.utcnow()
+    db.add_all([
+        User(id=1, full_name="Customer", email="customer@example.com", password_hash="x", role="customer"),
+        FoodItem(id=1, name="Shin Ramyun", category="Ramen", price=120.0),
+        FoodItem(id=2, name="Buldak", category="Buldak", price=150.0),
+        Cart(id=1, user_id=1, food_id=1, quantity=1),
+        Order(id=1, user_id=1, total_price=270.0, status="Pending", created_at=now),
+        OrderItem(id=1, order_id=1, food_id=1, quantity=1, subtotal=120.0),
+        OrderItem(id=2, order_id=1, food_id=2, quantity=1, subtotal=150.0),
+        LoginAttempt(email="__GLOBAL_LOCKOUT__", success=False, attempt_time=now,
+                     locked_until=now + timedelta(minutes=1)),
+    ])
+    db.commit()
+
+
+def capture_statements():
+    """Run every case on a scratch schema; returns [(name, allowed_scans, [(sql, params), ...])]"""
+    scratch = create_engine("sqlite://", future=True)
+    Base.metadata.create_all(bind=scratch)
+    with Session(bind=scratch, expire_on_commit=False) as db:
+        _seed(db)
+        install_menu_search(db)
+        db.commit()
+        load_catalog(db)  # the menu is read from memory, not from the app database
+
+    captured = []
+
+    @event.listens_for(scratch, "before_cursor_execute")
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().split(None, 1)[0].upper() in ("SELECT", "UPDATE", "DELETE", "WITH"):
+            captured.append((statement, parameters))
+
+    results = []
+    for name, call, allowed in CASES:
+        captured.clear()
+        with Session(bind=scratch, expire_on_commit=False) as db:
+            call(db)
+            db.commit()
+        results.append((name, allowed, list(captured)))
+    return results, scratch
+
+
+def explain(conn, statement, parameters):
+    """SQLite plan detail lines for one statement"""
+    rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    return [row[3] for row in rows]
+
+
+def full_scans(plan):
+    """Tables scanned without any index ("SCAN t" / "SCAN TABLE t")"""
+    tables = []
+    for detail in plan:
+        words = detail.split()
+        if words and words[0] == "SCAN" and "USING" not in words:
+            table = words[2] if len(words) > 2 and words[1] == "TABLE" else words[1] if len(words) > 1 else ""
+            if table in Base.metadata.tables:  # not subqueries / "SCAN CONSTANT ROW"
+                tables.append(table)
+    return tables
+
+
+def main(argv):
+    live = "--live" in argv
+    results, scratch = capture_statements()
+    target = live_engine if live else scratch
+    if target.dialect.name != "sqlite":
+        print(f"EXPLAIN QUERY PLAN needs SQLite, DATABASE_URL is {target.dialect.name}.")
+        return 2
+
+    problems = []
+    print(f"Query plans ({'DATABASE_URL' if live else 'scratch schema from models'})")
+    with target.connect() as conn:
+        for name, allowed, statements in results:
+            print(f"\n== {name}")
+            for statement, parameters in statements:
+                print("   " + " ".join(statement.split())[:160])
+                try:
+                    plan = explain(conn, statement, parameters)
+                except OperationalError as ex:
+                    # e.g. --live against a database that still needs `python -m core.migrations upgrade`
+                    problems.append((name, [str(ex.orig)]))
+                    print(f"      !! {ex.orig}")
+                    continue
+                unexpected = [t for t in full_scans(plan) if t not in allowed]
+                for detail in plan:
+                    print(f"      {detail}")
+                if unexpected:
+                    problems.append((name, unexpected))
+                    print(f"      !! full scan of {', '.join(unexpected)}")
+
+    print()
+    if problems:
+        print(f"{len(problems)} queries scan tables they should search by index (or cannot be planned):")
+        for name, tables in problems:
+            print(f"   - {name}: {', '.join(tables)}")
+        return 1
+    print("Every hot query path uses an index.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
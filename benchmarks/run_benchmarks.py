@@ -0,0 +1,375 @@
+# benchmarks/run_benchmarks.py
+"""
+Service-layer benchmarks, no Flet required.
+
+For each data size a temp-file SQLite database is filled by
+benchmarks.datagen (same seed every run), then every benchmark below runs a
+number of iterations, each in a fresh session. Reported per benchmark:
+latency percentiles (ms) and SQL statements per operation, counted by
+core.query_metrics. Results are printed as a table and written as JSON so
+runs can be diffed across versions.
+
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --sizes 10000,100000,1000000 --output before.json
+    python -m benchmarks.run_benchmarks --only analytics. --repeat 0.5
+    python -m benchmarks.run_benchmarks --only search. --menu-size 10000
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import sqlite3
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime
+import sqlalchemy
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session
+from core.db import apply_sqlite_pragmas
+from core import query_metrics
+from core.query_metrics import install_query_metrics, query_scope
+from core import analytics_cache, analytics_service
+from core.cart_service import add_to_cart, get_cart_count, get_cart_badge_count, get_cart_summary, update_cart_quantity
+from core.checkout_service import place_order
+from core.order_service import get_order_page
+from core.admin_order_service import list_orders
+from core.catalog_cache import load_catalog, get_menu_items, search_catalog
+from core.menu_search import search_menu
+from core.auth_service import authenticate_user
+from core.lockout_service import get_global_lockout, get_global_failed_attempts, record_login_attempt
+from core.session_manager import check_any_active_lockout
+from models.user import User
+from models.food_item import FoodItem
+from models.order import Order, OrderItem
+from benchmarks.datagen import generate, BENCH_PASSWORD
+
+DEFAULT_SIZES = "10000,100000"  # orders per dataset; users = orders / 50 (at least 200)
+
+BENCHMARKS = []  # {"name", "iterations", "run", "setup"}
+
+
+def benchmark(name, iterations=100, setup=None):
+    """Register `run(db, ctx, *setup(db, ctx))` as a benchmark"""
+    def register(run):
+        BENCHMARKS.append({"name": name, "iterations": iterations, "run": run, "setup": setup})
+        return run
+    return register
+
+
+class Context:
+    """Ids to pick from, plus the seeded RNG every benchmark draws from"""
+
+    def __init__(self, db, seed):
+        self.rng = random.Random(seed)
+        self.user_ids = db.execute(select(User.id).where(User.role == "customer").order_by(User.id)).scalars().all()
+        self.food_ids = db.execute(select(FoodItem.id).order_by(FoodItem.id)).scalars().all()
+        self.emails = dict(db.execute(select(User.id, User.email).where(User.id.in_(self.user_ids[:50]))).all())
+
+    def user(self):
+        return self.rng.choice(self.user_ids)
+
+    def food(self):
+        return self.rng.choice(self.food_ids)
+
+
+# ---- cart ----------------------------------------------------------------------------
+
+@benchmark("cart.add_to_cart", 200)
+def _add_to_cart(db, ctx):
+    add_to_cart(db, ctx.user(), ctx.food())
+
+
+@benchmark("cart.get_cart_count", 200)
+def _get_cart_count(db, ctx):
+    get_cart_count(db, ctx.user())
+
+
+@benchmark("cart.get_cart_badge_count", 200)
+def _get_cart_badge_count(db, ctx):
+    get_cart_badge_count(db, ctx.user())
+
+
+@benchmark("cart.get_cart_summary", 200)
+def _get_cart_summary(db, ctx):
+    get_cart_summary(db, ctx.user())
+
+
+def _cart_line(db, ctx):
+    user_id = ctx.user()
+    add_to_cart(db, user_id, ctx.food())
+    return user_id, get_cart_summary(db, user_id)["items"][0]
+
+
+@benchmark("cart.change_quantity", 100, setup=_cart_line)
+def _change_quantity(db, ctx, user_id, line):
+    # cart tab +/-: one write with the rendered quantity, then the re-render's one read
+    update_cart_quantity(db, line["cart_id"], line["quantity"] + 1)
+    get_cart_summary(db, user_id)
+
+
+# ---- menu ----------------------------------------------------------------------------
+
+@benchmark("menu.get_menu_items", 200)
+def _menu_items(db, ctx):
+    # food_view category chip: served from the in-memory catalog
+    get_menu_items(ctx.rng.choice(["All", "Noodles", "Drinks", "Combo"]))
+
+
+@benchmark("menu.query_category", 200)
+def _menu_query(db, ctx):
+    # What food_view ran per chip click before the catalog cache
+    category = ctx.rng.choice(["All", "Noodles", "Drinks", "Combo"])
+    query = db.query(FoodItem)
+    if category != "All":
+        query = query.filter(FoodItem.category == category)
+    query.all()
+
+
+# ---- search --------------------------------------------------------------------------
+
+SEARCH_TERMS = ["spi", "kimchi", "garlic chick", "tteok", "honey ram", "bul", "drinks", "chee",
+                "yangnyeom fried", "bingsu", "soy mandu", "x"]
+
+
+@benchmark("search.search_menu", 200)
+def _search_menu(db, ctx):
+    # FTS5 on SQLite: ranked, prefix terms over name, description and category
+    search_menu(db, ctx.rng.choice(SEARCH_TERMS))
+
+
+@benchmark("search.catalog_fallback", 200)
+def _search_catalog(db, ctx):
+    # The non-FTS fallback: prefix-word scan of the in-memory catalog
+    search_catalog(ctx.rng.choice(SEARCH_TERMS), 50)
+
+
+@benchmark("search.name_ilike", 200)
+def _search_ilike(db, ctx):
+    # What food_view ran per keystroke before FTS5 (names only, unranked)
+    term = ctx.rng.choice(SEARCH_TERMS)
+    db.query(FoodItem).filter(FoodItem.name.ilike(f"%{term}%")).all()
+
+
+# ---- checkout ------------------------------------------------------------------------
+
+def _fill_cart(db, ctx):
+    user_id = ctx.user()
+    for _ in range(3):
+        add_to_cart(db, user_id, ctx.food(), ctx.rng.randint(1, 2))
+    return (user_id,)
+
+
+@benchmark("checkout.place_order", 100, setup=_fill_cart)
+def _checkout(db, ctx, user_id):
+    place_order(db, user_id, checkout_token=uuid.UUID(int=ctx.rng.getrandbits(128)).hex)
+
+
+# ---- auth / lockout ------------------------------------------------------------------
+
+@benchmark("auth.authenticate_user", 10)
+def _authenticate(db, ctx):
+    email = ctx.rng.choice(list(ctx.emails.values()))
+    user, _ = authenticate_user(db, email, BENCH_PASSWORD)
+    assert user is not None
+
+
+@benchmark("lockout.failed_login_path", 200)
+def _failed_login(db, ctx):
+    # login_view: lockout check, rejected credentials, attempt recorded, window counted
+    email = f"nobody{ctx.rng.randrange(10**6)}@example.com"
+    get_global_lockout(db)
+    authenticate_user(db, email, "wrong-password")
+    record_login_attempt(db, email, False)
+    get_global_failed_attempts(db)
+
+
+@benchmark("lockout.check_any_active_lockout", 200)
+def _any_lockout(db, ctx):
+    check_any_active_lockout(db)
+
+
+# ---- order history -------------------------------------------------------------------
+
+def order_history(db, user_id):
+    """The queries order_history_view used to run (orders, then items and foods per order); baseline for get_order_page"""
+    rows = []
+    for order in db.query(Order).filter(Order.user_id == user_id).order_by(Order.created_at.desc()).all():
+        for item in db.query(OrderItem).filter(OrderItem.order_id == order.id).all():
+            food = db.get(FoodItem, item.food_id)
+            if food:
+                rows.append((order.id, food.name, item.quantity))
+    return rows
+
+
+@benchmark("orders.order_history", 50)
+def _order_history(db, ctx):
+    order_history(db, ctx.user())
+
+
+@benchmark("orders.order_history_page", 200)
+def _order_history_page(db, ctx):
+    get_order_page(db, ctx.user())
+
+
+def _history_cursor(db, ctx):
+    """Cursor a few pages into a user's history (first page when it is shorter)"""
+    user_id, after = ctx.user(), None
+    for _ in range(3):
+        result = get_order_page(db, user_id, after=after)
+        if result["next"] is None:
+            break
+        after = result["next"]
+    return user_id, after
+
+
+@benchmark("orders.order_history_next_page", 200, setup=_history_cursor)
+def _order_history_next_page(db, ctx, user_id, after):
+    get_order_page(db, user_id, after=after)
+
+
+@benchmark("orders.admin_list_orders", 200)
+def _admin_list_orders(db, ctx):
+    list_orders(db)
+
+
+@benchmark("orders.admin_list_orders_filtered", 200)
+def _admin_list_orders_filtered(db, ctx):
+    list_orders(db, status=ctx.rng.choice(["Pending", "Completed", "Cancelled"]))
+
+
+# ---- analytics -----------------------------------------------------------------------
+
+ANALYTICS = [
+    ("get_sales_trends", ("rollup", "sql", "pandas")),
+    ("get_best_selling_items", ("rollup", "sql", "pandas")),
+    ("get_revenue_by_category", ("rollup", "sql", "pandas")),
+    ("get_customer_order_frequency", ("sql", "pandas")),
+    ("get_hourly_sales_pattern", ("rollup", "sql", "pandas")),
+    ("get_inventory_alerts", ("rollup", "sql", "pandas")),
+    ("get_dashboard_summary", ("sql", "pandas")),
+]
+
+
+def _register_analytics():
+    for func_name, backends in ANALYTICS:
+        for backend in backends:
+            def run(db, ctx, func_name=func_name, backend=backend):
+                getattr(analytics_service, func_name)(db, backend=backend)
+            benchmark(f"analytics.{func_name}[{backend}]", 5 if backend == "pandas" else 20)(run)
+
+
+_register_analytics()
+
+
+# ---- runner --------------------------------------------------------------------------
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def bench_engine(path):
+    engine = create_engine(f"sqlite:///{path}", future=True, connect_args={"check_same_thread": False})
+    event.listen(engine, "connect", apply_sqlite_pragmas)
+    install_query_metrics(engine)
+    return engine
+
+
+def run_one(engine, bench, ctx, repeat):
+    iterations = max(1, int(bench["iterations"] * repeat))
+    latencies, queries, n_plus_one = [], [], 0
+    for i in range(iterations + 1):  # first iteration warms caches and is not recorded
+        with Session(bind=engine, expire_on_commit=False, autoflush=False) as db:
+            args = bench["setup"](db, ctx) if bench["setup"] else ()
+            with query_scope(bench["name"]) as scope:
+                started = time.perf_counter()
+                bench["run"](db, ctx, *args)
+                elapsed = (time.perf_counter() - started) * 1000
+        if i:
+            latencies.append(elapsed)
+            queries.append(scope.queries)
+            n_plus_one = max(n_plus_one, scope.n_plus_one)
+    latencies.sort()
+    return {
+        "benchmark": bench["name"],
+        "iterations": iterations,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p90_ms": round(percentile(latencies, 90), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "max_ms": round(latencies[-1], 3),
+        "queries_per_op": round(sum(queries) / len(queries), 2),
+        "n_plus_one_shapes": n_plus_one,  # statements repeated past the N+1 threshold in one op
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Service-layer benchmarks")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated order counts")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--menu-size", type=int, default=60, help="menu items per dataset (search: try 10000)")
+    parser.add_argument("--only", default="", help="run benchmarks whose name starts with this prefix")
+    parser.add_argument("--repeat", type=float, default=1.0, help="multiply every benchmark's iteration count")
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args(argv)
+
+    # Measure the queries themselves, not the analytics result cache; N+1s go in the report
+    analytics_cache.ANALYTICS_CACHE_TTL = 0
+    query_metrics.QUERY_METRICS = True
+    query_metrics.QUERY_N_PLUS_ONE_WARN = False
+
+    benches = [b for b in BENCHMARKS if b["name"].startswith(args.only)]
+    report = {
+        "meta": {
+            "started_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "sqlite": sqlite3.sqlite_version,
+            "seed": args.seed,
+        },
+        "results": [],
+    }
+
+    for orders in [int(s) for s in args.sizes.split(",") if s.strip()]:
+        users = max(200, orders // 50)
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = bench_engine(os.path.join(tmp, "bench.db"))
+            print(f"\nDataset: {orders} orders, {users} users, {args.menu_size} menu items")
+            counts = generate(engine, users=users, orders=orders, days=365, menu_size=args.menu_size,
+                              seed=args.seed, verbose=False)
+            print(f"   generated in {counts['seconds']}s")
+            with Session(bind=engine) as db:
+                ctx = Context(db, args.seed)
+                load_catalog(db)
+            print(f"   {'benchmark':<52}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'queries':>9}{'N+1':>5}")
+            for bench in benches:
+                result = run_one(engine, bench, ctx, args.repeat)
+                result.update(size={"orders": orders, "users": users, "menu_items": args.menu_size})
+                report["results"].append(result)
+                print(f"   {result['benchmark']:<52}{result['p50_ms']:>10.2f}{result['p90_ms']:>10.2f}"
+                      f"{result['p99_ms']:>10.2f}{result['queries_per_op']:>9}{result['n_plus_one_shapes']:>5}")
+            engine.dispose()
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,121 @@
+# benchmarks/upgrade_check.py
+"""
+Upgrade-path check for the migration runner.
+
+Builds a scratch SQLite database with the schema the old init_db.py created
+(frozen below, so later model changes cannot leak into it), adds a few rows,
+runs core.migrations.upgrade() to head and compares the result with a schema
+built from the current models: every model table, column and index must exist.
+Exits with status 1 if the upgrade fails or anything is missing.
+
+    python -m benchmarks.upgrade_check
+"""
+import sys
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import Session
+from core.db import Base
+from core.migrations import upgrade, current_version, available_migrations
+import models.user, models.food_item, models.order, models.cart  # noqa: F401  (mappers for the migrations)
+import models.audit_log, models.login_attempt, models.sales_rollup  # noqa: F401
+
+# sqlite_master of a database created by the baseline init_db.py
+BASELINE_SCHEMA = [
+    """CREATE TABLE users (
+        id INTEGER NOT NULL, full_name VARCHAR NOT NULL, email VARCHAR NOT NULL,
+        password_hash VARCHAR NOT NULL, phone VARCHAR, role VARCHAR, two_fa_enabled BOOLEAN,
+        two_fa_backup_codes VARCHAR, google_id VARCHAR, profile_picture VARCHAR, created_at DATETIME,
+        PRIMARY KEY (id), UNIQUE (google_id))""",
+    "CREATE INDEX ix_users_id ON users (id)",
+    "CREATE UNIQUE INDEX ix_users_email ON users (email)",
+    """CREATE TABLE food_items (
+        id INTEGER NOT NULL, name VARCHAR NOT NULL, description VARCHAR, category VARCHAR,
+        price FLOAT NOT NULL, image VARCHAR, PRIMARY KEY (id))""",
+    "CREATE INDEX ix_food_items_id ON food_items (id)",
+    """CREATE TABLE audit_logs (
+        id INTEGER NOT NULL, user_email VARCHAR, action VARCHAR, timestamp DATETIME, PRIMARY KEY (id))""",
+    "CREATE INDEX ix_audit_logs_id ON audit_logs (id)",
+    """CREATE TABLE login_attempts (
+        id INTEGER NOT NULL, email VARCHAR NOT NULL, ip_address VARCHAR, success BOOLEAN,
+        attempt_time DATETIME, locked_until DATETIME, failed_attempts INTEGER, PRIMARY KEY (id))""",
+    "CREATE INDEX ix_login_attempts_email ON login_attempts (email)",
+    "CREATE INDEX ix_login_attempts_id ON login_attempts (id)",
+    """CREATE TABLE orders (
+        id INTEGER NOT NULL, user_id INTEGER NOT NULL, total_price FLOAT NOT NULL, status VARCHAR,
+        created_at DATETIME, PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES users (id))""",
+    "CREATE INDEX ix_orders_id ON orders (id)",
+    """CREATE TABLE carts (
+        id INTEGER NOT NULL, user_id INTEGER NOT NULL, food_id INTEGER NOT NULL, quantity INTEGER,
+        created_at DATETIME, PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES users (id),
+        FOREIGN KEY(food_id) REFERENCES food_items (id))""",
+    "CREATE INDEX ix_carts_id ON carts (id)",
+    """CREATE TABLE order_items (
+        id INTEGER NOT NULL, order_id INTEGER NOT NULL, food_id INTEGER NOT NULL, quantity INTEGER NOT NULL,
+        subtotal FLOAT NOT NULL, PRIMARY KEY (id), FOREIGN KEY(order_id) REFERENCES orders (id),
+        FOREIGN KEY(food_id) REFERENCES food_items (id))""",
+    "CREATE INDEX ix_order_items_id ON order_items (id)",
+]
+
+# Rows for the data migrations to work on (duplicate cart lines, orders to backfill)
+BASELINE_ROWS = [
+    "INSERT INTO users (id, full_name, email, password_hash, role) VALUES (1, 'Customer', 'customer@example.com', 'x', 'customer')",
+    "INSERT INTO food_items (id, name, category, price) VALUES (1, 'Shin Ramyun', 'Ramen', 120.0), (2, 'Buldak', 'Buldak', 150.0)",
+    "INSERT INTO carts (id, user_id, food_id, quantity) VALUES (1, 1, 1, 1), (2, 1, 1, 2), (3, 1, 2, 1)",
+    "INSERT INTO orders (id, user_id, total_price, status, created_at) VALUES (1, 1, 270.0, 'Completed', '2025-12-01 12:00:00')",
+    "INSERT INTO order_items (id, order_id, food_id, quantity, subtotal) VALUES (1, 1, 1, 1, 120.0), (2, 1, 2, 1, 150.0)",
+]
+
+
+def schema_of(engine):
+    """{table: (column names, index names)}"""
+    inspector = inspect(engine)
+    return {
+        table: ({c["name"] for c in inspector.get_columns(table)}, {ix["name"] for ix in inspector.get_indexes(table)})
+        for table in inspector.get_table_names()
+    }
+
+
+def missing_from(upgraded, expected):
+    """Human-readable list of tables, columns and indexes in `expected` but not `upgraded`"""
+    missing = []
+    for table, (columns, indexes) in sorted(expected.items()):
+        if table not in upgraded:
+            missing.append(f"table {table}")
+            continue
+        have_columns, have_indexes = upgraded[table]
+        missing += [f"column {table}.{c}" for c in sorted(columns - have_columns)]
+        missing += [f"index {ix} on {table}" for ix in sorted(indexes - have_indexes)]
+    return missing
+
+
+def main():
+    scratch = create_engine("sqlite://", future=True)
+    with scratch.begin() as conn:
+        for statement in BASELINE_SCHEMA + BASELINE_ROWS:
+            conn.exec_driver_sql(statement)
+
+    with Session(bind=scratch) as db:
+        try:
+            upgrade(db)
+        except Exception as ex:
+            print(f"Upgrade from the baseline schema failed: {ex}")
+            return 1
+        version = current_version(db)
+
+    fresh = create_engine("sqlite://", future=True)
+    Base.metadata.create_all(bind=fresh)
+    missing = missing_from(schema_of(scratch), schema_of(fresh))
+
+    head = available_migrations()[-1][0]
+    if version != head:
+        missing.append(f"schema version {version}, expected {head}")
+    if missing:
+        print(f"Upgraded baseline schema differs from the models ({len(missing)}):")
+        for item in missing:
+            print(f"   - {item}")
+        return 1
+    print(f"Baseline schema upgraded cleanly to version {version}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+# core/admin_order_service.py
+"""
+Orders board for the admin panel: filtered, keyset-paginated pages of
+orders (newest first) with the customer's name joined in, and status
+changes that keep the sales rollups and the audit log in the same
+transaction.
+
+Filters map onto indexes on orders: status -> ix_orders_status_created_at,
+date range -> ix_orders_created_at, customer -> the matching users' ids
+through ix_orders_user_id_created_at.
+"""
+from sqlalchemy import select, update, or_, tuple_
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from models.order import Order
+from models.user import User
+from models.audit_log import AuditLog
+from core.db import retry_on_busy
+from core.rollup_service import record_status_change
+
+ADMIN_ORDER_PAGE_SIZE = 30
+ORDER_STATUSES = ["Pending", "Completed", "Cancelled"]
+
+
+def _order_rows():
+    return (
+        select(Order.id, Order.user_id, Order.status, Order.created_at, Order.total_price,
+               User.full_name, User.email)
+        .outerjoin(User, User.id == Order.user_id)
+    )
+
+
+def _as_dict(row):
+    return {
+        "id": row.id,
+        "user_id": row.user_id,
+        "status": row.status,
+        "created_at": row.created_at,
+        "total_price": row.total_price,
+        "customer": row.full_name or "Unknown",
+        "email": row.email,
+    }
+
+
+def list_orders(db: Session, status: str = None, date_from=None, date_to=None, customer: str = None,
+                after=None, limit: int = ADMIN_ORDER_PAGE_SIZE):
+    """
+    One page of orders, newest first:
+    {"orders": [{id, user_id, status, created_at, total_price, customer, email}], "next": cursor}.
+
+    status: exact match; date_from / date_to: created_at >= date_from and
+    < date_to; customer: part of the customer's name or email. Pass "next"
+    back as `after` for the following page (None on the last one).
+    """
+    query = _order_rows().order_by(Order.created_at.desc(), Order.id.desc()).limit(limit + 1)
+    if status:
+        query = query.where(Order.status == status)
+    if date_from is not None:
+        query = query.where(Order.created_at >= date_from)
+    if date_to is not None:
+        query = query.where(Order.created_at < date_to)
+    customer = (customer or "").strip()
+    if customer:
+        # % and _ typed by the admin are literal characters, not wildcards
+        escaped = customer.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        pattern = f"%{escaped}%"
+        query = query.where(Order.user_id.in_(
+            select(User.id).where(or_(User.full_name.ilike(pattern, escape="\\"),
+                                      User.email.ilike(pattern, escape="\\")))
+        ))
+    if after is not None:
+        query = query.where(tuple_(Order.created_at, Order.id) < tuple_(*after))
+
+    rows = db.execute(query).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    last = rows[-1] if rows else None
+    return {
+        "orders": [_as_dict(row) for row in rows],
+        "next": (last.created_at, last.id) if has_more else None,
+    }
+
+
+def get_order_row(db: Session, order_id: int):
+    """A single order in list_orders() form, or None"""
+    row = db.execute(_order_rows().where(Order.id == order_id)).first()
+    return _as_dict(row) if row else None
+
+
+@retry_on_busy
+def update_order_status(db: Session, order_id: int, status: str, admin_email: str = None):
+    """
+    Set an order's status, move its totals to the new rollup bucket and
+    audit the change, in one transaction (committing it also invalidates
+    the analytics cache). Returns the order in list_orders() form, or None
+    if it no longer exists. If another admin changed the status first, the
+    order is returned as they left it.
+    """
+    if status not in ORDER_STATUSES:
+        raise ValueError(f"Unknown order status: {status}")
+    order = db.get(Order, order_id, populate_existing=True)
+    if order is None:
+        return None
+    old_status = order.status
+    if old_status != status:
+        # Conditional on the status we read, so two admins can't both move the rollups
+        changed = db.execute(
+            update(Order).where(Order.id == order_id, Order.status == old_status).values(status=status)
+        ).rowcount
+        if changed:
+            set_committed_value(order, "status", status)
+            record_status_change(db, order, old_status)
+            db.add(AuditLog(user_email=admin_email, action=f"Updated order #{order_id} to {status}"))
+        db.commit()
+    return get_order_row(db, order_id)
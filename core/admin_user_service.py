@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from models.user import User
 from core.auth_service import hash_password
+from core.rollup_service import remove_orders
 from core.email_service import generate_verification_code, send_verification_email, store_verification_code, verify_code
 
 def create_user_by_admin(db: Session, full_name: str, email: str, password: str, role: str = "customer") -> User:
@@ -68,6 +69,8 @@ def delete_user_by_admin(db: Session, user_id: int) -> tuple:
         return False, "User not found"
     
     try:
+        # Their orders are cascaded away, so take them out of the sales rollups too
+        remove_orders(db, user.orders)
         db.delete(user)
         db.commit()
         return True, f"User {user.email} deleted successfully"
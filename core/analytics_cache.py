@@ -0,0 +1,102 @@
+# core/analytics_cache.py
+"""
+Result cache in front of core.analytics_service.
+
+Entries are keyed by function name + arguments (the db session is ignored),
+expire after ANALYTICS_CACHE_TTL seconds and are dropped whenever a
+transaction that touched the sales rollups commits. Concurrent callers
+asking for the same key share one computation (single-flight).
+"""
+import os
+import time
+import inspect
+import threading
+import functools
+from concurrent.futures import Future
+from dotenv import load_dotenv
+from sqlalchemy import event
+from core.db import SessionLocal
+
+load_dotenv()
+ANALYTICS_CACHE_TTL = int(os.getenv("ANALYTICS_CACHE_TTL", "60"))  # seconds, 0 disables
+
+_cache = {}      # key -> (expires_at, value)
+_inflight = {}   # key -> Future shared by concurrent callers
+_generation = 0  # bumped on invalidation so in-flight results from before it are not stored
+_lock = threading.Lock()
+
+
+def invalidate_analytics():
+    """Drop every cached result"""
+    global _generation
+    with _lock:
+        _generation += 1
+        _cache.clear()
+        _inflight.clear()
+
+
+def invalidate_on_commit(db):
+    """Invalidate the cache once `db`'s current transaction commits"""
+    db.info["analytics_dirty"] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidate_after_commit(session):
+    if session.info.pop("analytics_dirty", False):
+        invalidate_analytics()
+
+
+@event.listens_for(SessionLocal, "after_soft_rollback")
+def _discard_on_rollback(session, previous_transaction):
+    session.info.pop("analytics_dirty", None)
+
+
+def cached_analytics(func):
+    """Cache `func(db, ...)` results by name and arguments"""
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(db, *args, **kwargs):
+        if ANALYTICS_CACHE_TTL <= 0:
+            return func(db, *args, **kwargs)
+
+        # Normalise so f(db), f(db, 10) and f(db, limit=10) share one entry
+        bound = signature.bind(db, *args, **kwargs)
+        bound.apply_defaults()
+        key = (func.__name__,) + tuple(
+            (name, value) for name, value in bound.arguments.items() if name != "db"
+        )
+
+        with _lock:
+            entry = _cache.get(key)
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+            future = _inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                _inflight[key] = future
+                generation = _generation
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = func(db, *args, **kwargs)
+        except Exception as ex:
+            with _lock:
+                if _inflight.get(key) is future:
+                    del _inflight[key]
+            future.set_exception(ex)
+            raise
+
+        with _lock:
+            if _inflight.get(key) is future:
+                del _inflight[key]
+            if generation == _generation:
+                _cache[key] = (time.monotonic() + ANALYTICS_CACHE_TTL, value)
+        future.set_result(value)
+        return value
+
+    wrapper.uncached = func
+    return wrapper
@@ -0,0 +1,139 @@
+# core/analytics_frame.py
+"""
+Vectorized analytics backend (analytics_service functions with backend="pandas").
+
+load_sales_frame() reads the orders / order_items / food_items columns in a
+single joined scan with pd.read_sql; every metric below is then a groupby
+over that in-memory frame. Results match the SQL backend's dict shapes and
+ordering, with plain Python numbers.
+"""
+from datetime import datetime, timedelta
+import pandas as pd
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+from models.order import Order, OrderItem
+from models.food_item import FoodItem
+from models.user import User
+from core.analytics_cache import cached_analytics
+
+
+class SalesFrame:
+    """orders: one row per order; items: one row per order item with a live food item"""
+
+    def __init__(self, rows: pd.DataFrame, customer_ids, total_items: int):
+        rows["created_at"] = pd.to_datetime(rows["created_at"])
+        self.orders = rows.drop_duplicates("order_id")[["order_id", "user_id", "total_price", "created_at"]]
+        self.items = rows[rows["item_id"].notna() & rows["food_exists"].notna()]
+        self.customer_ids = customer_ids
+        self.total_items = total_items
+
+
+@cached_analytics
+def load_sales_frame(db: Session) -> SalesFrame:
+    """Single columnar scan of orders LEFT JOIN order_items LEFT JOIN food_items"""
+    conn = db.connection()
+    rows = pd.read_sql(
+        select(
+            Order.id.label("order_id"),
+            Order.user_id,
+            Order.total_price,
+            Order.created_at,
+            OrderItem.id.label("item_id"),
+            OrderItem.quantity,
+            OrderItem.subtotal,
+            FoodItem.id.label("food_exists"),
+            FoodItem.name,
+            FoodItem.category,
+        )
+        .select_from(Order)
+        .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        .outerjoin(FoodItem, FoodItem.id == OrderItem.food_id)
+        .order_by(Order.id, OrderItem.id),
+        conn,
+        parse_dates=["created_at"],
+    )
+    customer_ids = pd.read_sql(select(User.id).where(User.role == "customer"), conn)["id"]
+    total_items = db.execute(select(func.count(FoodItem.id))).scalar()
+    return SalesFrame(rows, customer_ids, total_items)
+
+
+def _to_python(values):
+    return [v.item() if hasattr(v, "item") else v for v in values]
+
+
+def sales_trends(frame: SalesFrame, period="daily", days=30):
+    end_day = datetime.utcnow().date()
+    start = datetime.combine(end_day - timedelta(days=days), datetime.min.time())
+    end = datetime.combine(end_day + timedelta(days=1), datetime.min.time())
+
+    orders = frame.orders[(frame.orders["created_at"] >= start) & (frame.orders["created_at"] < end)]
+    fmt = "%Y-%m-%d" if period == "daily" else "%Y-W%U" if period == "weekly" else "%Y-%m"
+    revenue = orders.groupby(orders["created_at"].dt.strftime(fmt))["total_price"].sum().sort_index()
+    return {
+        "dates": list(revenue.index),
+        "revenue": [float(v) for v in revenue.values]
+    }
+
+
+def best_selling_items(frame: SalesFrame, limit=10):
+    stats = frame.items.groupby("name").agg(
+        quantity=("quantity", "sum"),
+        revenue=("subtotal", "sum"),
+        category=("category", "max"),
+        first_sold=("item_id", "min"),
+    )
+    stats = stats.sort_values(["quantity", "first_sold"], ascending=[False, True]).head(limit)
+    return [
+        {
+            "name": name,
+            "quantity": int(row.quantity),
+            "revenue": float(row.revenue),
+            "category": None if pd.isna(row.category) else row.category
+        }
+        for name, row in stats.iterrows()
+    ]
+
+
+def revenue_by_category(frame: SalesFrame):
+    stats = frame.items.groupby("category", dropna=False).agg(
+        revenue=("subtotal", "sum"),
+        first_sold=("item_id", "min"),
+    ).sort_values("first_sold")
+    return {
+        "categories": [None if pd.isna(c) else c for c in stats.index],
+        "revenue": [float(v) for v in stats["revenue"]]
+    }
+
+
+def customer_order_frequency(frame: SalesFrame):
+    per_customer = (
+        frame.orders["user_id"].value_counts()
+        .reindex(frame.customer_ids, fill_value=0)
+    )
+    distribution = per_customer.value_counts().sort_index()
+    return {
+        "order_counts": _to_python(distribution.index),
+        "customer_counts": _to_python(distribution.values)
+    }
+
+
+def hourly_sales_pattern(frame: SalesFrame):
+    counts = frame.orders["created_at"].dt.hour.value_counts().reindex(range(24), fill_value=0)
+    return {
+        "hours": list(range(24)),
+        "orders": _to_python(counts.values)
+    }
+
+
+def dashboard_summary(frame: SalesFrame):
+    orders = frame.orders
+    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    today = orders[orders["created_at"] >= today_start]
+    return {
+        "total_orders": len(orders),
+        "total_revenue": float(orders["total_price"].sum()) if len(orders) else 0,
+        "total_customers": len(frame.customer_ids),
+        "total_items": frame.total_items,
+        "today_orders": len(today),
+        "today_revenue": float(today["total_price"].sum()) if len(today) else 0
+    }
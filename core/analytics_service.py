@@ -1,36 +1,64 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import func, select, extract
 from models.order import Order, OrderItem
 from models.food_item import FoodItem
 from models.user import User
-from datetime import datetime, timedelta
+from models.sales_rollup import SalesDaily, SalesHourly, SalesByItem
+from core.analytics_cache import cached_analytics
+from core import analytics_frame
+from datetime import datetime, timedelta, date
 from collections import defaultdict
-import pandas as pd
 
-def get_sales_trends(db: Session, period="daily", days=30):
+def _as_date(value):
+    """SQLite returns DATE() as a string, other backends as a date object"""
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value), "%Y-%m-%d").date()
+
+def _period_key(day, period):
+    if period == "daily":
+        return day.strftime("%Y-%m-%d")
+    elif period == "weekly":
+        return day.strftime("%Y-W%U")  # Year-Week
+    return day.strftime("%Y-%m")  # monthly
+
+@cached_analytics
+def get_sales_trends(db: Session, period="daily", days=30, backend="rollup"):
     """
     Get sales trends for specified period
+    Covers whole calendar days, from `days` ago through today.
+    backend: "rollup" (sales_daily), "sql" (raw orders) or "pandas"
     Returns: dict with dates and revenue
     """
-    end_date = datetime.utcnow()
-    start_date = end_date - timedelta(days=days)
+    if backend == "pandas":
+        return analytics_frame.sales_trends(analytics_frame.load_sales_frame(db), period, days)
     
-    orders = db.query(Order).filter(
-        Order.created_at >= start_date,
-        Order.created_at <= end_date
-    ).all()
+    end_day = datetime.utcnow().date()
+    start_day = end_day - timedelta(days=days)
+    
+    # One row per calendar day; weeks/months are folded from the days below
+    if backend == "rollup":
+        rows = db.execute(
+            select(SalesDaily.day, func.sum(SalesDaily.revenue))
+            .where(SalesDaily.day >= start_day.isoformat(), SalesDaily.day <= end_day.isoformat())
+            .group_by(SalesDaily.day)
+        ).all()
+    else:
+        day_col = func.date(Order.created_at)
+        rows = db.execute(
+            select(day_col, func.sum(Order.total_price))
+            .where(
+                Order.created_at >= datetime.combine(start_day, datetime.min.time()),
+                Order.created_at < datetime.combine(end_day + timedelta(days=1), datetime.min.time())
+            )
+            .group_by(day_col)
+        ).all()
     
     # Group by date
     sales_data = defaultdict(float)
     
-    for order in orders:
-        if period == "daily":
-            date_key = order.created_at.strftime("%Y-%m-%d")
-        elif period == "weekly":
-            date_key = order.created_at.strftime("%Y-W%U")  # Year-Week
-        else:  # monthly
-            date_key = order.created_at.strftime("%Y-%m")
-        
-        sales_data[date_key] += order.total_price
+    for day, revenue in rows:
+        sales_data[_period_key(_as_date(day), period)] += revenue or 0.0
     
     # Sort by date
     sorted_data = dict(sorted(sales_data.items()))
@@ -40,111 +68,147 @@ def get_sales_trends(db: Session, period="daily", days=30):
         "revenue": list(sorted_data.values())
     }
 
-def get_best_selling_items(db: Session, limit=10):
+@cached_analytics
+def get_best_selling_items(db: Session, limit=10, backend="rollup"):
     """
     Get top selling food items
+    backend: "rollup" (sales_by_item), "sql" (raw order items) or "pandas"
     Returns: list of dicts with item name, quantity sold, revenue
     """
-    # Query all order items
-    order_items = db.query(OrderItem).all()
+    if backend == "pandas":
+        return analytics_frame.best_selling_items(analytics_frame.load_sales_frame(db), limit)
     
-    # Aggregate by food item
-    item_stats = defaultdict(lambda: {"quantity": 0, "revenue": 0.0})
+    if backend == "rollup":
+        source, quantity_col, revenue_col, first_sold = (
+            SalesByItem, SalesByItem.quantity, SalesByItem.revenue, SalesByItem.first_item_id
+        )
+    else:
+        source, quantity_col, revenue_col, first_sold = (
+            OrderItem, OrderItem.quantity, OrderItem.subtotal, OrderItem.id
+        )
     
-    for oi in order_items:
-        food = db.query(FoodItem).filter(FoodItem.id == oi.food_id).first()
-        if food:
-            item_stats[food.name]["quantity"] += oi.quantity
-            item_stats[food.name]["revenue"] += oi.subtotal
-            item_stats[food.name]["category"] = food.category
+    # Aggregate by food item name; ties keep the order items were first sold in
+    quantity = func.sum(quantity_col)
+    rows = db.execute(
+        select(
+            FoodItem.name,
+            quantity,
+            func.sum(revenue_col),
+            func.max(FoodItem.category)
+        )
+        .select_from(source)
+        .join(FoodItem, FoodItem.id == source.food_id)
+        .group_by(FoodItem.name)
+        .order_by(quantity.desc(), func.min(first_sold))
+        .limit(limit)
+    ).all()
     
-    # Convert to list and sort by quantity
-    items_list = [
+    return [
         {
             "name": name,
-            "quantity": stats["quantity"],
-            "revenue": stats["revenue"],
-            "category": stats.get("category", "Unknown")
+            "quantity": qty,
+            "revenue": revenue,
+            "category": category
         }
-        for name, stats in item_stats.items()
+        for name, qty, revenue, category in rows
     ]
-    
-    items_list.sort(key=lambda x: x["quantity"], reverse=True)
-    
-    return items_list[:limit]
 
-def get_revenue_by_category(db: Session):
+@cached_analytics
+def get_revenue_by_category(db: Session, backend="rollup"):
     """
     Get revenue breakdown by food category
+    The rollup is per food item, so re-categorised items move their history with them.
+    backend: "rollup" (sales_by_item), "sql" (raw order items) or "pandas"
     Returns: dict with categories and revenue
     """
-    categories = defaultdict(float)
+    if backend == "pandas":
+        return analytics_frame.revenue_by_category(analytics_frame.load_sales_frame(db))
     
-    order_items = db.query(OrderItem).all()
+    if backend == "rollup":
+        source, revenue_col, first_sold = SalesByItem, SalesByItem.revenue, SalesByItem.first_item_id
+    else:
+        source, revenue_col, first_sold = OrderItem, OrderItem.subtotal, OrderItem.id
     
-    for oi in order_items:
-        food = db.query(FoodItem).filter(FoodItem.id == oi.food_id).first()
-        if food:
-            categories[food.category] += oi.subtotal
+    rows = db.execute(
+        select(FoodItem.category, func.sum(revenue_col))
+        .select_from(source)
+        .join(FoodItem, FoodItem.id == source.food_id)
+        .group_by(FoodItem.category)
+        .order_by(func.min(first_sold))
+    ).all()
     
     return {
-        "categories": list(categories.keys()),
-        "revenue": list(categories.values())
+        "categories": [category for category, _ in rows],
+        "revenue": [revenue for _, revenue in rows]
     }
 
-def get_customer_order_frequency(db: Session):
+@cached_analytics
+def get_customer_order_frequency(db: Session, backend="sql"):
     """
     Get customer order frequency distribution
+    backend: "sql" or "pandas"
     Returns: dict with order counts and customer counts
     """
-    # Get all users
-    users = db.query(User).filter(User.role == "customer").all()
-    
-    order_counts = defaultdict(int)
+    if backend == "pandas":
+        return analytics_frame.customer_order_frequency(analytics_frame.load_sales_frame(db))
     
-    for user in users:
-        user_orders = db.query(Order).filter(Order.user_id == user.id).count()
-        order_counts[user_orders] += 1
-    
-    # Sort by order count
-    sorted_counts = dict(sorted(order_counts.items()))
+    # Orders per customer (customers without orders count as 0)
+    per_customer = (
+        select(func.count(Order.id).label("order_count"))
+        .select_from(User)
+        .outerjoin(Order, Order.user_id == User.id)
+        .where(User.role == "customer")
+        .group_by(User.id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(per_customer.c.order_count, func.count())
+        .group_by(per_customer.c.order_count)
+        .order_by(per_customer.c.order_count)
+    ).all()
     
     return {
-        "order_counts": list(sorted_counts.keys()),
-        "customer_counts": list(sorted_counts.values())
+        "order_counts": [order_count for order_count, _ in rows],
+        "customer_counts": [customers for _, customers in rows]
     }
 
-def get_hourly_sales_pattern(db: Session):
+@cached_analytics
+def get_hourly_sales_pattern(db: Session, backend="rollup"):
     """
     Get sales pattern by hour of day
+    backend: "rollup" (sales_hourly), "sql" (raw orders) or "pandas"
     Returns: dict with hours and order counts
     """
-    orders = db.query(Order).all()
+    if backend == "pandas":
+        return analytics_frame.hourly_sales_pattern(analytics_frame.load_sales_frame(db))
     
-    hourly_data = defaultdict(int)
-    
-    for order in orders:
-        hour = order.created_at.hour
-        hourly_data[hour] += 1
+    if backend == "rollup":
+        rows = db.execute(
+            select(SalesHourly.hour, func.sum(SalesHourly.order_count)).group_by(SalesHourly.hour)
+        ).all()
+    else:
+        hour_col = extract("hour", Order.created_at)
+        rows = db.execute(
+            select(hour_col, func.count(Order.id)).group_by(hour_col)
+        ).all()
     
     # Fill in missing hours with 0
-    for h in range(24):
-        if h not in hourly_data:
-            hourly_data[h] = 0
-    
-    sorted_data = dict(sorted(hourly_data.items()))
+    hourly_data = {h: 0 for h in range(24)}
+    for hour, count in rows:
+        hourly_data[int(hour)] = count
     
     return {
-        "hours": list(sorted_data.keys()),
-        "orders": list(sorted_data.values())
+        "hours": list(hourly_data.keys()),
+        "orders": list(hourly_data.values())
     }
 
-def get_inventory_alerts(db: Session):
+@cached_analytics
+def get_inventory_alerts(db: Session, backend="rollup"):
     """
     Get items that might need restocking based on popularity
     Returns: list of items with predicted demand
     """
-    best_sellers = get_best_selling_items(db, limit=20)
+    best_sellers = get_best_selling_items(db, limit=20, backend=backend)
     
     # Simple prediction: items selling more than 10 units are "high demand"
     alerts = []
@@ -160,20 +224,29 @@ def get_inventory_alerts(db: Session):
     
     return alerts
 
-def get_dashboard_summary(db: Session):
+@cached_analytics
+def get_dashboard_summary(db: Session, backend="sql"):
     """
     Get overall dashboard summary stats
+    backend: "sql" or "pandas"
     Returns: dict with key metrics
     """
-    total_orders = db.query(Order).count()
-    total_revenue = sum([o.total_price for o in db.query(Order).all()])
-    total_customers = db.query(User).filter(User.role == "customer").count()
-    total_items = db.query(FoodItem).count()
+    if backend == "pandas":
+        return analytics_frame.dashboard_summary(analytics_frame.load_sales_frame(db))
     
-    # Get today's stats
     today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    today_orders = db.query(Order).filter(Order.created_at >= today_start).count()
-    today_revenue = sum([o.total_price for o in db.query(Order).filter(Order.created_at >= today_start).all()])
+    
+    # All metrics in a single round-trip
+    row = db.execute(select(
+        select(func.count(Order.id)).scalar_subquery(),
+        select(func.coalesce(func.sum(Order.total_price), 0)).scalar_subquery(),
+        select(func.count(User.id)).where(User.role == "customer").scalar_subquery(),
+        select(func.count(FoodItem.id)).scalar_subquery(),
+        # Get today's stats
+        select(func.count(Order.id)).where(Order.created_at >= today_start).scalar_subquery(),
+        select(func.coalesce(func.sum(Order.total_price), 0)).where(Order.created_at >= today_start).scalar_subquery(),
+    )).one()
+    total_orders, total_revenue, total_customers, total_items, today_orders, today_revenue = row
     
     return {
         "total_orders": total_orders,
@@ -0,0 +1,169 @@
+# core/asset_manifest.py
+"""
+In-memory list of the files under assets/, so views can ask whether an image
+exists (and how big it is) without a filesystem stat per card per render.
+
+The tree is walked once (load_manifest(), at startup or on first use).
+Code that writes or deletes files there (core.upload_store,
+core.image_service) calls register_asset() / forget_asset(). Changes made
+outside this process (another app instance, a restored backup) are picked
+up by the optional watchdog observer (ASSET_WATCH=1, see
+start_asset_watcher()) or the next restart. Image dimensions are read from
+the file header the first time they are asked for, then remembered.
+"""
+import os
+import threading
+from dotenv import load_dotenv
+
+try:
+    from PIL import Image
+except ImportError:  # dimensions are unknown without Pillow
+    Image = None
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = FileSystemEventHandler = None
+
+load_dotenv()
+ASSET_ROOT = "assets"
+ASSET_WATCH = os.getenv("ASSET_WATCH", "0") == "1"
+
+_lock = threading.Lock()
+_manifest = {
+    "loaded": False,
+    "files": set(),   # normalised paths of every file under ASSET_ROOT
+    "sizes": {},      # path -> (width, height), or None if unreadable
+}
+_watcher = {"observer": None}
+
+
+def _key(path: str) -> str:
+    return os.path.normpath(path)
+
+
+def _managed(key: str) -> bool:
+    return key == ASSET_ROOT or key.startswith(ASSET_ROOT + os.sep)
+
+
+def load_manifest():
+    """(Re)scan ASSET_ROOT; returns the number of files"""
+    files = set()
+    for directory, _, names in os.walk(ASSET_ROOT):
+        files.update(_key(os.path.join(directory, name)) for name in names if not name.endswith(".tmp"))
+    with _lock:
+        _manifest.update(loaded=True, files=files, sizes={})
+    return len(files)
+
+
+def _files():
+    if not _manifest["loaded"]:
+        load_manifest()
+    return _manifest["files"]
+
+
+def register_asset(path: str):
+    """Record a file just written under ASSET_ROOT"""
+    key = _key(path)
+    if not _managed(key):
+        return
+    files = _files()
+    with _lock:
+        files.add(key)
+        _manifest["sizes"].pop(key, None)
+
+
+def forget_asset(path: str):
+    """Record a file just deleted from ASSET_ROOT"""
+    key = _key(path)
+    files = _files()
+    with _lock:
+        files.discard(key)
+        _manifest["sizes"].pop(key, None)
+
+
+def _forget_tree(directory: str):
+    prefix = _key(directory) + os.sep
+    files = _files()
+    with _lock:
+        for key in [k for k in files if k.startswith(prefix)]:
+            files.discard(key)
+            _manifest["sizes"].pop(key, None)
+
+
+def asset_exists(path: str) -> bool:
+    """Does the file exist? From memory for paths under ASSET_ROOT"""
+    if not path:
+        return False
+    key = _key(path)
+    if not _managed(key):
+        return os.path.exists(path)
+    return key in _files()
+
+
+def asset_size(path: str):
+    """(width, height) of an image, or None if it is missing or unreadable"""
+    if not asset_exists(path):
+        return None
+    key = _key(path)
+    with _lock:
+        if key in _manifest["sizes"]:
+            return _manifest["sizes"][key]
+    size = None
+    if Image is not None:
+        try:
+            with Image.open(path) as image:  # reads the header only
+                size = image.size
+        except (OSError, ValueError):
+            pass
+    with _lock:
+        _manifest["sizes"][key] = size
+    return size
+
+
+def start_asset_watcher():
+    """Keep the manifest in step with ASSET_ROOT using watchdog; returns the observer, or None"""
+    if _watcher["observer"] is not None:
+        return _watcher["observer"]
+    if Observer is None:
+        print("watchdog is not installed; the asset manifest only tracks this process's uploads")
+        return None
+    if not os.path.isdir(ASSET_ROOT):
+        return None
+
+    class ManifestHandler(FileSystemEventHandler):
+        def on_created(self, event):
+            if not event.is_directory and not event.src_path.endswith(".tmp"):
+                register_asset(os.path.relpath(event.src_path))
+
+        def on_modified(self, event):
+            self.on_created(event)
+
+        def on_deleted(self, event):
+            if event.is_directory:
+                _forget_tree(os.path.relpath(event.src_path))
+            else:
+                forget_asset(os.path.relpath(event.src_path))
+
+        def on_moved(self, event):
+            self.on_deleted(event)
+            if event.is_directory:
+                load_manifest()  # rare; rescanning beats walking the moved subtree
+            elif not event.dest_path.endswith(".tmp"):
+                register_asset(os.path.relpath(event.dest_path))
+
+    _files()
+    observer = Observer()
+    observer.daemon = True
+    observer.schedule(ManifestHandler(), ASSET_ROOT, recursive=True)
+    observer.start()
+    _watcher["observer"] = observer
+    return observer
+
+
+def stop_asset_watcher():
+    observer = _watcher["observer"]
+    if observer is not None:
+        observer.stop()
+        _watcher["observer"] = None
@@ -0,0 +1,162 @@
+# core/cart_buffer.py
+"""
+Write-behind cart quantities (CART_WRITE_BEHIND=1).
+
+The cart tab's +/- taps only record a per-user quantity change here and
+bump the in-memory badge; the UI patches itself without waiting for the
+database. Changes to the same item are coalesced and written by
+cart_service.apply_cart_deltas() CART_FLUSH_DELAY_MS after the user's last
+tap, on a timer thread with its own session. Because the writes are deltas,
+concurrent changes from other sessions are merged rather than overwritten.
+
+flush_cart(user_id) writes pending changes immediately: call it before
+anything reads the cart from the database (cart render, checkout) and on
+logout. A flush that finds the database busy puts its changes back and tries
+again, up to CART_FLUSH_RETRIES times; any other error drops the changes
+that cannot be written and recounts the badge from the database.
+
+A +/- change only adjusts a row that still exists when it is written. The
+optimistic lines on screen may then be off (changes dropped, or merged with
+another session's), so after every flush the callback registered with
+watch_cart() runs; the cart view uses it to re-read the cart and redraw if
+the database disagrees with what it shows.
+"""
+import os
+import threading
+from dotenv import load_dotenv
+from core.debounce import Debouncer
+from core.session_registry import thread_session
+from core.db import is_busy_error
+from core.cart_service import apply_cart_deltas, adjust_cart_badge, forget_cart_badge
+
+load_dotenv()
+CART_WRITE_BEHIND = os.getenv("CART_WRITE_BEHIND", "1") == "1"
+CART_FLUSH_DELAY_MS = int(os.getenv("CART_FLUSH_DELAY_MS", "400"))
+CART_FLUSH_RETRIES = int(os.getenv("CART_FLUSH_RETRIES", "5"))  # busy flushes re-queued before giving up
+
+_pending = {}     # user_id -> {food_id: quantity change not yet written}
+_busy_retries = {}  # user_id -> consecutive flushes that found the database busy
+_watchers = {}    # user_id -> callback(user_id), run after each flush of that user's changes
+_lock = threading.Lock()
+_flush_lock = threading.Lock()  # one flush at a time, so taps never wait on the database
+
+
+def queue_cart_change(user_id: int, food_id: int, delta: int):
+    """Record a quantity change for later; the badge reflects it immediately"""
+    with _lock:
+        changes = _pending.setdefault(user_id, {})
+        changes[food_id] = changes.get(food_id, 0) + delta
+    adjust_cart_badge(user_id, delta)
+    _debouncer.trigger(user_id)
+
+
+def pending_cart_changes(user_id: int):
+    with _lock:
+        return dict(_pending.get(user_id, {}))
+
+
+def watch_cart(user_id: int, callback):
+    """Run callback(user_id) on the flushing thread after each flush of the user's changes"""
+    with _lock:
+        _watchers[user_id] = callback
+
+
+def unwatch_cart(user_id: int):
+    with _lock:
+        _watchers.pop(user_id, None)
+
+
+def _notify(user_id: int):
+    with _lock:
+        callback = _watchers.get(user_id)
+    if callback is not None:
+        try:
+            callback(user_id)
+        except Exception as ex:
+            print(f"Cart watcher error for user {user_id}: {ex}")
+
+
+def _requeue(user_id: int, changes: dict):
+    """Put unwritten changes back, merged with any taps made meanwhile"""
+    with _lock:
+        merged = _pending.setdefault(user_id, {})
+        for food_id, delta in changes.items():
+            merged[food_id] = merged.get(food_id, 0) + delta
+
+
+def _apply_one_by_one(db, user_id: int, changes: dict):
+    """After a non-busy failure: write each change alone and drop the ones that fail"""
+    dropped = []
+    for food_id, delta in changes.items():
+        try:
+            apply_cart_deltas(db, user_id, {food_id: delta})
+        except Exception as ex:
+            db.rollback()  # part of the batch is written already, so no re-queueing here
+            dropped.append(food_id)
+            print(f"Cart change dropped for user {user_id}, food {food_id}: {ex}")
+    return dropped
+
+
+def flush_cart(user_id: int):
+    """Write the user's pending changes now; returns True if they were all written"""
+    _debouncer.cancel(user_id)
+    with _flush_lock:
+        with _lock:
+            changes = _pending.pop(user_id, None)
+        if not changes:
+            return False
+        written = _write(user_id, changes)
+    if written is not None:
+        _notify(user_id)  # written or dropped: the watcher reconciles what it shows
+    return bool(written)
+
+
+def _write(user_id: int, changes: dict):
+    """
+    One flush attempt: True if every change was written, False if some were
+    dropped, None if they were put back for a retry
+    """
+    try:
+        with thread_session() as db:
+            try:
+                apply_cart_deltas(db, user_id, changes)
+            except Exception as ex:
+                if is_busy_error(ex):
+                    raise
+                db.rollback()
+                # A permanent error (e.g. a food item deleted meanwhile): keep
+                # what can be written, drop the rest and recount the badge
+                dropped = _apply_one_by_one(db, user_id, changes)
+                forget_cart_badge(user_id)
+                return not dropped
+    except Exception as ex:
+        if not is_busy_error(ex):
+            forget_cart_badge(user_id)
+            print(f"Cart flush error for user {user_id}, changes dropped: {ex}")
+            return False
+        with _lock:
+            attempts = _busy_retries[user_id] = _busy_retries.get(user_id, 0) + 1
+        if attempts > CART_FLUSH_RETRIES:
+            with _lock:
+                _busy_retries.pop(user_id, None)
+            forget_cart_badge(user_id)
+            print(f"Cart flush for user {user_id} gave up after {CART_FLUSH_RETRIES} busy retries")
+            return False
+        _requeue(user_id, changes)
+        _debouncer.trigger(user_id)
+        print(f"Cart flush for user {user_id} found the database busy; retry {attempts}/{CART_FLUSH_RETRIES}")
+        return None
+    with _lock:
+        _busy_retries.pop(user_id, None)
+    return True
+
+
+def flush_all_carts():
+    """Flush every user's pending changes (shutdown)"""
+    with _lock:
+        user_ids = list(_pending)
+    for user_id in user_ids:
+        flush_cart(user_id)
+
+
+_debouncer = Debouncer(flush_cart, CART_FLUSH_DELAY_MS / 1000)
@@ -1,62 +1,156 @@
+import threading
+from sqlalchemy import select, update, delete, func, bindparam
 from sqlalchemy.orm import Session
 from models.cart import Cart
-from models.food_item import FoodItem
+from core.catalog_cache import get_catalog_item
+from core.db import retry_on_busy, upsert_insert
+
+# Write-through cart badge: user_id -> total quantity in the cart. Filled on
+# first read, then kept current by the writes below (after they commit).
+_badge_counts = {}
+_badge_lock = threading.Lock()
+
+
+def _adjust_badge(user_id: int, delta: int):
+    with _badge_lock:
+        if user_id in _badge_counts:
+            _badge_counts[user_id] = max(0, _badge_counts[user_id] + delta)
+
+
+def _set_badge(user_id: int, count: int):
+    with _badge_lock:
+        _badge_counts[user_id] = count
+
+
+def adjust_cart_badge(user_id: int, delta: int):
+    """For cart writes made outside this module (e.g. checkout), after their commit"""
+    _adjust_badge(user_id, delta)
+
+
+def forget_cart_badge(user_id: int):
+    """Drop the cached count so the next badge read goes to the database"""
+    with _badge_lock:
+        _badge_counts.pop(user_id, None)
+
 
 def get_user_cart(db: Session, user_id: int):
     """Get all cart items for a user"""
     return db.query(Cart).filter(Cart.user_id == user_id).all()
 
+@retry_on_busy
 def add_to_cart(db: Session, user_id: int, food_id: int, quantity: int = 1):
-    """Add item to cart or update quantity if exists"""
-    # Check if item already in cart
-    cart_item = db.query(Cart).filter(
-        Cart.user_id == user_id,
-        Cart.food_id == food_id
-    ).first()
-    
-    if cart_item:
-        # Update quantity
-        cart_item.quantity += quantity
-    else:
-        # Add new item
-        cart_item = Cart(
-            user_id=user_id,
-            food_id=food_id,
-            quantity=quantity
-        )
-        db.add(cart_item)
-    
+    """Add item to cart or update quantity if exists (one upsert statement)"""
+    stmt = upsert_insert(db, Cart).values(user_id=user_id, food_id=food_id, quantity=quantity)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["user_id", "food_id"],
+        set_={"quantity": Cart.quantity + stmt.excluded.quantity}
+    ))
     db.commit()
-    db.refresh(cart_item)
-    return cart_item
+    _adjust_badge(user_id, quantity)
 
+@retry_on_busy
 def update_cart_quantity(db: Session, cart_id: int, quantity: int):
-    """Update cart item quantity"""
-    cart_item = db.query(Cart).filter(Cart.id == cart_id).first()
-    if cart_item:
-        if quantity <= 0:
-            db.delete(cart_item)
-        else:
-            cart_item.quantity = quantity
-        db.commit()
-        return True
-    return False
+    """Update cart item quantity (one statement; quantity <= 0 removes the row)"""
+    if quantity <= 0:
+        return remove_from_cart(db, cart_id)
+    user_id = db.execute(
+        update(Cart).where(Cart.id == cart_id).values(quantity=quantity).returning(Cart.user_id)
+    ).scalar()
+    db.commit()
+    if user_id is None:
+        return False
+    forget_cart_badge(user_id)  # re-counted by the next get_cart_summary / badge read
+    return True
 
+@retry_on_busy
 def remove_from_cart(db: Session, cart_id: int):
     """Remove item from cart"""
-    cart_item = db.query(Cart).filter(Cart.id == cart_id).first()
-    if cart_item:
-        db.delete(cart_item)
-        db.commit()
-        return True
-    return False
+    user_id = db.execute(delete(Cart).where(Cart.id == cart_id).returning(Cart.user_id)).scalar()
+    db.commit()
+    if user_id is None:
+        return False
+    forget_cart_badge(user_id)
+    return True
 
+@retry_on_busy
+def apply_cart_deltas(db: Session, user_id: int, deltas: dict):
+    """
+    Add {food_id: quantity change} to the user's cart rows in one transaction
+    (used by core.cart_buffer). Changes are relative, so writes made meanwhile
+    by other sessions are kept; rows that end at zero or below are deleted.
+    A change for a row that is gone meanwhile (e.g. checked out elsewhere)
+    is dropped rather than re-creating the row.
+    """
+    updates = [{"b_user_id": user_id, "b_food_id": food_id, "b_delta": delta}
+               for food_id, delta in deltas.items() if delta]
+    if not updates:
+        return
+    cart = Cart.__table__
+    updated = db.execute(
+        cart.update()
+        .where(cart.c.user_id == bindparam("b_user_id"), cart.c.food_id == bindparam("b_food_id"))
+        .values(quantity=cart.c.quantity + bindparam("b_delta")),
+        updates
+    ).rowcount
+    removed = db.execute(
+        delete(Cart).where(Cart.user_id == user_id, Cart.quantity <= 0).returning(Cart.quantity)
+    ).scalars().all()
+    db.commit()
+    if updated != len(updates) or any(quantity < 0 for quantity in removed):
+        # Changes to rows that were already gone: the optimistic badge is off, recount it
+        forget_cart_badge(user_id)
+
+@retry_on_busy
 def clear_user_cart(db: Session, user_id: int):
     """Clear all cart items for a user"""
     db.query(Cart).filter(Cart.user_id == user_id).delete()
     db.commit()
+    _set_badge(user_id, 0)
+
+def get_cart_summary(db: Session, user_id: int):
+    """
+    Priced cart for the cart tab and the checkout page, from one cart query
+    priced from the menu catalog (core.catalog_cache):
+    {"items": [{"cart_id", "food_id", "name", "image", "unit_price", "quantity", "subtotal"}],
+     "total": float, "count": int}
+    Rows whose menu item was deleted are left out (checkout drops them).
+    Also refreshes the badge count.
+    """
+    rows = db.execute(
+        select(Cart.id, Cart.food_id, Cart.quantity).where(Cart.user_id == user_id).order_by(Cart.id)
+    ).all()
+    items = []
+    for cart_id, food_id, quantity in rows:
+        food = get_catalog_item(food_id)
+        if food is None:
+            continue
+        items.append({
+            "cart_id": cart_id,
+            "food_id": food_id,
+            "name": food.name,
+            "image": food.image,
+            "unit_price": food.price,
+            "quantity": quantity,
+            "subtotal": food.price * quantity,
+        })
+    _set_badge(user_id, sum(row.quantity for row in rows))
+    return {
+        "items": items,
+        "total": sum(item["subtotal"] for item in items),
+        "count": sum(item["quantity"] for item in items),
+    }
 
 def get_cart_count(db: Session, user_id: int):
     """Get total number of items in cart"""
-    items = db.query(Cart).filter(Cart.user_id == user_id).all()
-    return sum(item.quantity for item in items)
\ No newline at end of file
+    return db.execute(
+        select(func.coalesce(func.sum(Cart.quantity), 0)).where(Cart.user_id == user_id)
+    ).scalar()
+
+def get_cart_badge_count(db: Session, user_id: int):
+    """Cart count for the badge: from memory, hitting the database only on first use"""
+    with _badge_lock:
+        if user_id in _badge_counts:
+            return _badge_counts[user_id]
+    count = get_cart_count(db, user_id)
+    _set_badge(user_id, count)
+    return count
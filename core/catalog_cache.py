@@ -0,0 +1,131 @@
+# core/catalog_cache.py
+"""
+Process-wide, read-only copy of the menu for customer-facing views.
+
+The whole food_items table is small, so it is loaded with one query (at
+startup via load_catalog(), or lazily on first read) and indexed by id and
+category. Admin writes call invalidate_catalog() after they commit; that
+bumps a version counter and the next read reloads. Checkout still prices
+orders from the database, so a stale copy can never change what is charged.
+"""
+import re
+import threading
+from dataclasses import dataclass
+from sqlalchemy import select
+from core.db import SessionLocal
+from models.food_item import FoodItem
+
+
+@dataclass(frozen=True)
+class CatalogItem:
+    """Detached snapshot of a FoodItem row (same attribute names)"""
+    id: int
+    name: str
+    description: str
+    category: str
+    price: float
+    image: str = None
+
+
+_lock = threading.Lock()
+_catalog = {
+    "version": 0,           # bumped by invalidate_catalog()
+    "loaded_version": -1,   # version the indexes below were built for
+    "items": [],            # every item, in id order
+    "by_id": {},
+    "by_category": {},
+    "words": {},            # id -> (" name words", " description and category words"), for search_catalog()
+}
+
+_WORD = re.compile(r"\w+")
+
+
+def catalog_version() -> int:
+    with _lock:
+        return _catalog["version"]
+
+
+def invalidate_catalog():
+    """Call after committing a menu change; the next read reloads the catalog"""
+    with _lock:
+        _catalog["version"] += 1
+
+
+def load_catalog(db=None):
+    """(Re)build the catalog from the database; returns the number of items"""
+    with _lock:
+        version = _catalog["version"]
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        rows = db.execute(
+            select(FoodItem.id, FoodItem.name, FoodItem.description, FoodItem.category,
+                   FoodItem.price, FoodItem.image).order_by(FoodItem.id)
+        ).all()
+    finally:
+        if own_session:
+            db.close()
+
+    items = [CatalogItem(id=r.id, name=r.name, description=r.description or "", category=r.category,
+                         price=r.price, image=r.image) for r in rows]
+    by_category = {}
+    for item in items:
+        by_category.setdefault(item.category, []).append(item)
+    # Words joined with a leading space: " " + term in text is a word-prefix match
+    words = {
+        item.id: (" " + " ".join(_WORD.findall(item.name.lower())),
+                  " " + " ".join(_WORD.findall(f"{item.description} {item.category or ''}".lower())))
+        for item in items
+    }
+    with _lock:
+        # An invalidation that raced with this load keeps the catalog marked stale
+        _catalog.update(items=items, by_id={item.id: item for item in items},
+                        by_category=by_category, words=words, loaded_version=version)
+    return len(items)
+
+
+def _current():
+    with _lock:
+        if _catalog["loaded_version"] == _catalog["version"]:
+            return _catalog
+    load_catalog()
+    return _catalog
+
+
+def get_menu_items(category: str = "All"):
+    """Menu items, optionally for one category, in id order"""
+    catalog = _current()
+    if category == "All":
+        return list(catalog["items"])
+    return list(catalog["by_category"].get(category, []))
+
+
+def get_catalog_item(food_id: int):
+    """CatalogItem for `food_id`, or None if it is not on the menu"""
+    return _current()["by_id"].get(food_id)
+
+
+def search_catalog(keyword: str, limit: int = None):
+    """
+    Items where every word of `keyword` starts a word of the name, description
+    or category; name matches rank first. The fallback for core.menu_search.
+    """
+    terms = [" " + term for term in _WORD.findall(keyword.lower())]
+    if not terms:
+        return []
+    catalog = _current()
+    scored = []
+    for item in catalog["items"]:
+        name_words, other_words = catalog["words"][item.id]
+        score = 0
+        for term in terms:
+            if term in name_words:
+                score += 2
+            elif term in other_words:
+                score += 1
+            else:
+                break
+        else:
+            scored.append((-score, item.name.lower(), item.id, item))
+    scored.sort(key=lambda entry: entry[:3])
+    return [entry[3] for entry in scored[:limit]]
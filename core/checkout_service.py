@@ -0,0 +1,84 @@
+# core/checkout_service.py
+from datetime import datetime
+from sqlalchemy import select, insert, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from models.cart import Cart
+from models.food_item import FoodItem
+from models.order import Order, OrderItem
+from core.db import retry_on_busy
+from core.rollup_service import record_order
+from core.cart_service import adjust_cart_badge
+
+
+def get_order_by_checkout_token(db: Session, user_id: int, checkout_token: str):
+    return db.execute(
+        select(Order).where(Order.checkout_token == checkout_token, Order.user_id == user_id)
+    ).scalar_one_or_none()
+
+
+@retry_on_busy
+def place_order(db: Session, user_id: int, checkout_token: str = None):
+    """
+    Turn the user's cart into a Pending order in a single transaction:
+    cart rows joined to current prices, order and items inserted in bulk,
+    the ordered cart rows deleted with one statement, rollups updated.
+    Returns the new Order, or None if the cart has nothing orderable.
+
+    `checkout_token` is the idempotency key of one checkout attempt (unique
+    on orders): submitting the same token again, even concurrently, returns
+    the order it already created instead of placing another one.
+    """
+    try:
+        if checkout_token:
+            existing = get_order_by_checkout_token(db, user_id, checkout_token)
+            if existing:
+                return existing
+
+        cart_rows = db.execute(
+            select(Cart.id, Cart.food_id, Cart.quantity, FoodItem.price)
+            .outerjoin(FoodItem, FoodItem.id == Cart.food_id)
+            .where(Cart.user_id == user_id)
+            .order_by(Cart.id)
+        ).all()
+        # Rows whose menu item was deleted are dropped from the cart, not ordered
+        lines = [(food_id, quantity, price * quantity)
+                 for _, food_id, quantity, price in cart_rows if price is not None]
+        if not lines:
+            if cart_rows:
+                db.execute(delete(Cart).where(Cart.id.in_([row[0] for row in cart_rows])))
+                db.commit()
+                adjust_cart_badge(user_id, -sum(row[2] for row in cart_rows))
+            return None
+
+        order = Order(
+            user_id=user_id,
+            total_price=sum(subtotal for _, _, subtotal in lines),
+            status="Pending",
+            created_at=datetime.now(),
+            checkout_token=checkout_token
+        )
+        db.add(order)
+        try:
+            db.flush()
+        except IntegrityError:
+            # A concurrent submit with the same token won the unique index
+            db.rollback()
+            existing = get_order_by_checkout_token(db, user_id, checkout_token) if checkout_token else None
+            if existing is None:
+                raise
+            return existing
+
+        db.execute(insert(OrderItem), [
+            {"order_id": order.id, "food_id": food_id, "quantity": quantity, "subtotal": subtotal}
+            for food_id, quantity, subtotal in lines
+        ])
+        # Only the rows that were read; anything added meanwhile stays in the cart
+        db.execute(delete(Cart).where(Cart.id.in_([row[0] for row in cart_rows])))
+        record_order(db, order)
+        db.commit()
+        adjust_cart_badge(user_id, -sum(row[2] for row in cart_rows))
+        return order
+    except Exception:
+        db.rollback()
+        raise
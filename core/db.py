@@ -1,19 +1,60 @@
 # core/db.py
 import os
+import time
+import random
+import functools
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker, declarative_base
+from core.query_metrics import install_query_metrics
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///pojangmacha.db")
 
+# SQLite PRAGMA profile applied to every new connection (empty value = leave SQLite's default).
+# WAL lets readers keep going while checkout writes; busy_timeout makes writers wait for the
+# lock instead of failing with "database is locked".
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"),
+    "cache_size": os.getenv("SQLITE_CACHE_SIZE", "-20000"),      # negative = KiB (~20 MB)
+    "mmap_size": os.getenv("SQLITE_MMAP_SIZE", "268435456"),     # 256 MB
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+    # Off by default: order history keeps order_items for deleted menu items
+    "foreign_keys": os.getenv("SQLITE_FOREIGN_KEYS", "OFF"),
+}
+
+# Bounded retry for writes that still hit SQLITE_BUSY after busy_timeout
+DB_WRITE_RETRIES = int(os.getenv("DB_WRITE_RETRIES", "4"))
+DB_WRITE_RETRY_DELAY = float(os.getenv("DB_WRITE_RETRY_DELAY", "0.05"))  # seconds, doubles per attempt
+
 # Use future flag and disable check_same_thread only for SQLite
 connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
 
-# Create engine (fu ture mode)
+# Create engine (future mode)
 engine = create_engine(DATABASE_URL, future=True, connect_args=connect_args)
 
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Engine "connect" listener that applies SQLITE_PRAGMAS (also used by benchmark engines)"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            if value:
+                cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+if DATABASE_URL.startswith("sqlite"):
+    event.listen(engine, "connect", apply_sqlite_pragmas)
+
+# Per-view query counts, N+1 warnings and the slow-query log (core.query_metrics)
+install_query_metrics(engine)
+
 # SessionLocal factory: expire_on_commit=False avoids needing refresh() in many places
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False, future=True)
 
@@ -27,3 +68,44 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def is_busy_error(ex: Exception) -> bool:
+    """True for SQLite "database is locked" / "database is busy" errors"""
+    if not isinstance(ex, OperationalError):
+        return False
+    message = str(ex.orig).lower()
+    return "locked" in message or "busy" in message
+
+
+def retry_on_busy(func):
+    """
+    Retry a write service `func(db, ...)` with exponential backoff when SQLite is busy.
+    The wrapped function must do its whole unit of work and commit; the session is
+    rolled back before each retry.
+    """
+    @functools.wraps(func)
+    def wrapper(db, *args, **kwargs):
+        for attempt in range(DB_WRITE_RETRIES + 1):
+            try:
+                return func(db, *args, **kwargs)
+            except OperationalError as ex:
+                db.rollback()
+                if not is_busy_error(ex) or attempt == DB_WRITE_RETRIES:
+                    raise
+                delay = DB_WRITE_RETRY_DELAY * (2 ** attempt)
+                print(f"Database busy in {func.__name__}, retrying in {delay:.2f}s ({attempt + 1}/{DB_WRITE_RETRIES})")
+                time.sleep(delay * random.uniform(0.5, 1.5))
+    return wrapper
+
+
+def upsert_insert(db, model):
+    """
+    Return a dialect INSERT for `model` that supports on_conflict_do_update().
+    Only SQLite and PostgreSQL implement ON CONFLICT.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
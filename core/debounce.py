@@ -0,0 +1,51 @@
+# core/debounce.py
+"""
+Per-key debouncing: trigger(key) many times, `func(key)` runs once, `delay`
+seconds after the last trigger for that key, on a timer thread. Extra
+arguments to trigger() are passed on from the last trigger only.
+"""
+import threading
+
+
+class Debouncer:
+    """Run `func(key)` once `delay` seconds after the last trigger(key)"""
+
+    def __init__(self, func, delay: float):
+        self.func = func
+        self.delay = delay
+        self._timers = {}  # key -> threading.Timer
+        self._lock = threading.Lock()
+
+    def trigger(self, key=None, *args):
+        """(Re)start the key's timer; the call will be `func(key, *args)`"""
+        timer = threading.Timer(self.delay, self._fire, args=(key, args))
+        timer.name = f"debounce-{getattr(self.func, '__name__', 'func')}"
+        with self._lock:
+            previous = self._timers.get(key)
+            self._timers[key] = timer
+        if previous is not None:
+            previous.cancel()
+        timer.start()
+
+    def cancel(self, key=None):
+        """Drop the key's pending call; returns True if one was pending"""
+        with self._lock:
+            timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        return timer is not None
+
+    def pending(self):
+        """Keys with a call scheduled"""
+        with self._lock:
+            return list(self._timers)
+
+    def _fire(self, key, args):
+        with self._lock:
+            if self._timers.get(key) is not threading.current_thread():
+                return  # superseded by a later trigger
+            del self._timers[key]
+        try:
+            self.func(key, *args)
+        except Exception as ex:
+            print(f"Debounced {getattr(self.func, '__name__', 'call')}({key!r}) failed: {ex}")
@@ -0,0 +1,149 @@
+# core/image_service.py
+"""
+Pre-sized thumbnails for uploaded food and profile images.
+
+Every upload gets one square, center-cropped thumbnail per display size in
+THUMBNAIL_SIZES, written next to the original as `<name>@<size>.webp`
+(JPEG where Pillow lacks WebP). Views ask thumbnail_for(path, size) and fall
+back to the original until the thumbnail exists, so uploads never wait for
+resizing: upload handlers call make_thumbnails_async().
+
+Pillow is optional; without it no thumbnails are made and views keep
+showing the originals.
+
+    python -m core.image_service backfill          # thumbnails for every referenced image
+    python -m core.image_service backfill --force  # regenerate all
+"""
+import os
+import re
+import sys
+import threading
+from models.food_item import FoodItem
+from models.user import User
+from core.asset_manifest import asset_exists, register_asset, forget_asset
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # thumbnails are an optimisation; originals still work
+    Image = ImageOps = None
+
+# Display sizes (px) of the image boxes in the views
+THUMB_MENU = 80      # food_view cards, admin food cards
+THUMB_CART = 60      # cart_view lines
+THUMB_HISTORY = 50   # order_history_view items
+THUMB_AVATAR = 80    # profile_view picture
+THUMBNAIL_SIZES = sorted({THUMB_MENU, THUMB_CART, THUMB_HISTORY, THUMB_AVATAR})
+
+THUMBNAIL_QUALITY = 80
+THUMBNAIL_NAME = re.compile(r"^(?P<stem>.+)@(?P<size>\d+)\.(webp|jpg)$")  # "<stem>@<size>.<ext>"
+
+_warned = {"no_pillow": False}
+
+
+def _thumbnail_format():
+    if Image is not None and "WEBP" in Image.registered_extensions().values():
+        return "WEBP", ".webp"
+    return "JPEG", ".jpg"
+
+
+def thumbnail_path(path: str, size: int) -> str:
+    """Where the `size` px thumbnail of `path` lives"""
+    stem, _ = os.path.splitext(path)
+    return f"{stem}@{size}{_thumbnail_format()[1]}"
+
+
+def thumbnail_for(path: str, size: int) -> str:
+    """Thumbnail of `path` for a `size` px box, or `path` itself until one exists"""
+    if not path:
+        return path
+    thumb = thumbnail_path(path, size)
+    return thumb if asset_exists(thumb) else path
+
+
+def remove_thumbnails(path: str):
+    """Delete every thumbnail of `path` (either format); returns the paths removed"""
+    stem, _ = os.path.splitext(path)
+    removed = []
+    for size in THUMBNAIL_SIZES:
+        for ext in (".webp", ".jpg"):
+            thumb = f"{stem}@{size}{ext}"
+            if os.path.exists(thumb):
+                os.remove(thumb)
+                forget_asset(thumb)
+                removed.append(thumb)
+    return removed
+
+
+def make_thumbnails(path: str, force: bool = False):
+    """Write the missing thumbnails of `path`; returns the paths written"""
+    if Image is None:
+        if not _warned["no_pillow"]:
+            _warned["no_pillow"] = True
+            print("Pillow is not installed; images are shown without thumbnails")
+        return []
+    if not path or not os.path.exists(path):
+        return []
+
+    fmt, _ = _thumbnail_format()
+    targets = [(size, thumbnail_path(path, size)) for size in THUMBNAIL_SIZES]
+    targets = [(size, thumb) for size, thumb in targets if force or not os.path.exists(thumb)]
+    if not targets:
+        return []
+
+    written = []
+    with Image.open(path) as original:
+        image = ImageOps.exif_transpose(original)
+        image = image.convert("RGBA" if fmt == "WEBP" and "A" in image.getbands() else "RGB")
+        for size, thumb in targets:
+            # Same crop the views' ImageFit.COVER would show, at the box's exact size
+            resized = ImageOps.fit(image, (size, size), method=Image.LANCZOS)
+            tmp = f"{thumb}.tmp"
+            if fmt == "WEBP":
+                resized.save(tmp, format=fmt, quality=THUMBNAIL_QUALITY, method=4)
+            else:
+                resized.save(tmp, format=fmt, quality=THUMBNAIL_QUALITY, optimize=True)
+            os.replace(tmp, thumb)  # readers never see a half-written file
+            register_asset(thumb)
+            written.append(thumb)
+    return written
+
+
+def make_thumbnails_async(path: str, on_done=None):
+    """make_thumbnails() on a background thread; `on_done(written)` runs there afterwards"""
+    def run():
+        try:
+            written = make_thumbnails(path)
+        except Exception as ex:
+            print(f"Thumbnail error for {path}: {ex}")
+            return
+        if on_done:
+            on_done(written)
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def backfill_thumbnails(db, force: bool = False):
+    """Thumbnails for every image referenced by a food item or user; returns (images, written)"""
+    paths = {p for (p,) in db.query(FoodItem.image).filter(FoodItem.image.isnot(None)).all() if p}
+    paths |= {p for (p,) in db.query(User.profile_picture).filter(User.profile_picture.isnot(None)).all() if p}
+    written = 0
+    for path in sorted(paths):
+        try:
+            written += len(make_thumbnails(path, force=force))
+        except Exception as ex:
+            print(f"   {path}: {ex}")
+    return len(paths), written
+
+
+if __name__ == "__main__":
+    from core.db import SessionLocal
+    import models.order, models.cart  # noqa: F401  (mappers for the queries above)
+    if len(sys.argv) < 2 or sys.argv[1] != "backfill":
+        print("Usage: python -m core.image_service backfill [--force]")
+        sys.exit(2)
+    db = SessionLocal()
+    try:
+        images, written = backfill_thumbnails(db, force="--force" in sys.argv[2:])
+        print(f"{images} referenced image(s), {written} thumbnail(s) written.")
+    finally:
+        db.close()
@@ -1,7 +1,7 @@
 import os
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from core.db import SessionLocal
+from core.db import SessionLocal, retry_on_busy
 from models.login_attempt import LoginAttempt
 
 load_dotenv()
@@ -19,6 +19,7 @@ def get_global_failed_attempts(db):
         LoginAttempt.email != "__GLOBAL_LOCKOUT__"
     ).count()
 
+@retry_on_busy
 def set_global_lockout(db):
     """
     Set a global lockout by creating a special record.
@@ -47,6 +48,7 @@ def get_global_lockout(db):
         return lockout.locked_until
     return None
 
+@retry_on_busy
 def clear_global_lockout(db):
     """
     Remove all global lockout records.
@@ -54,6 +56,7 @@ def clear_global_lockout(db):
     db.query(LoginAttempt).filter(LoginAttempt.email == "__GLOBAL_LOCKOUT__").delete()
     db.commit()
 
+@retry_on_busy
 def record_login_attempt(db, email, success):
     """
     Record a login attempt for any email.
@@ -0,0 +1,121 @@
+# core/menu_search.py
+"""
+Ranked menu search for food_view.
+
+On SQLite the food_items_fts FTS5 table indexes name, description and
+category of food_items (external content, kept in sync by triggers on
+food_items, so admin adds / edits / deletes update it in the same
+transaction). Every word typed becomes a prefix term, all of them must
+match, and results are ranked by bm25 with name hits weighted highest.
+Other databases, or an SQLite build without FTS5, fall back to the same
+prefix-word search over the in-memory catalog (core.catalog_cache).
+
+    python -m core.menu_search rebuild    # re-index from food_items
+    python -m core.menu_search "spicy ram"
+"""
+import os
+import re
+import sys
+from dotenv import load_dotenv
+from sqlalchemy import text, inspect
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from core.db import SessionLocal
+from core.catalog_cache import get_catalog_item, search_catalog
+
+load_dotenv()
+SEARCH_DEBOUNCE_MS = int(os.getenv("SEARCH_DEBOUNCE_MS", "250"))  # food_view waits this long after the last keystroke
+
+FTS_TABLE = "food_items_fts"
+BM25_WEIGHTS = (10.0, 1.0, 4.0)  # name, description, category
+SEARCH_LIMIT = 50
+
+_WORD = re.compile(r"\w+")
+
+_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, description, category,
+        content='food_items', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS food_items_fts_ai AFTER INSERT ON food_items BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description, category)
+        VALUES (new.id, new.name, new.description, new.category);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS food_items_fts_ad AFTER DELETE ON food_items BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description, category)
+        VALUES ('delete', old.id, old.name, old.description, old.category);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS food_items_fts_au AFTER UPDATE ON food_items BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description, category)
+        VALUES ('delete', old.id, old.name, old.description, old.category);
+        INSERT INTO {FTS_TABLE}(rowid, name, description, category)
+        VALUES (new.id, new.name, new.description, new.category);
+    END""",
+]
+
+_available = {}  # engine -> FTS table present
+
+
+def install_menu_search(db: Session) -> bool:
+    """Create the FTS table and its sync triggers and index every item; False where FTS5 is unavailable"""
+    bind = db.get_bind()
+    if bind.dialect.name != "sqlite":
+        return False
+    try:
+        with db.begin_nested():
+            for ddl in _DDL:
+                db.execute(text(ddl))
+    except OperationalError as ex:
+        print(f"FTS5 unavailable ({ex.orig}); menu search will use the catalog fallback")
+        return False
+    rebuild_menu_search(db)
+    _available.pop(bind, None)
+    return True
+
+
+def rebuild_menu_search(db: Session):
+    db.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def menu_search_available(db: Session) -> bool:
+    bind = db.get_bind()
+    if bind not in _available:
+        _available[bind] = bind.dialect.name == "sqlite" and inspect(db.connection()).has_table(FTS_TABLE)
+    return _available[bind]
+
+
+def fts_query(keyword: str) -> str:
+    """'Spicy ram' -> '"spicy"* "ram"*' (every word a prefix term, all required)"""
+    return " ".join(f'"{word}"*' for word in _WORD.findall(keyword.lower()))
+
+
+def search_menu(db: Session, keyword: str, limit: int = SEARCH_LIMIT):
+    """Menu items (CatalogItem) matching `keyword`, best first"""
+    query = fts_query(keyword)
+    if not query:
+        return []
+    if not menu_search_available(db):
+        return search_catalog(keyword, limit)
+    ids = db.execute(
+        text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :query "
+             f"ORDER BY bm25({FTS_TABLE}, {', '.join(str(w) for w in BM25_WEIGHTS)}) LIMIT :limit"),
+        {"query": query, "limit": limit}
+    ).scalars().all()
+    items = [get_catalog_item(food_id) for food_id in ids]
+    return [item for item in items if item is not None]
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "rebuild"
+    db = SessionLocal()
+    try:
+        if command == "rebuild":
+            if install_menu_search(db):
+                db.commit()
+                print("Menu search index rebuilt.")
+        else:
+            for item in search_menu(db, " ".join(sys.argv[1:])):
+                print(f"   {item.id:>6}  {item.name}  ({item.category})")
+    finally:
+        db.close()
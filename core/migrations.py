@@ -0,0 +1,138 @@
+# core/migrations.py
+"""
+Versioned, non-destructive schema migrations.
+
+Migrations live in the `migrations` package as mNNNN_<name>.py modules, each
+with an `upgrade(db)` function; they run in version order and every applied
+version is recorded in the schema_version table. Migrations must be additive
+and safe to re-run (the helpers below all check before they change anything),
+so an interrupted upgrade can simply be started again.
+
+    python -m core.migrations status
+    python -m core.migrations upgrade
+
+ensure_schema() is the startup check: two cheap queries when the database is current.
+"""
+import os
+import re
+import sys
+import pkgutil
+import importlib
+from dotenv import load_dotenv
+from sqlalchemy import select, func, inspect, text
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateColumn
+from core.db import Base, SessionLocal
+from models.schema_version import SchemaVersion
+import migrations
+
+load_dotenv()
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "1") == "1"
+MIGRATION_CHUNK_SIZE = int(os.getenv("MIGRATION_CHUNK_SIZE", "5000"))  # rows per backfill transaction
+
+_MODULE_NAME = re.compile(r"^m(\d{4})_(\w+)$")
+
+
+def available_migrations():
+    """[(version, module name)] for every script in the migrations package, in order"""
+    found = []
+    for module in pkgutil.iter_modules(migrations.__path__):
+        match = _MODULE_NAME.match(module.name)
+        if match:
+            found.append((int(match.group(1)), module.name))
+    return sorted(found)
+
+
+def current_version(db: Session) -> int:
+    """Highest applied version, 0 for a database that has never been migrated"""
+    if not inspect(db.connection()).has_table(SchemaVersion.__tablename__):
+        return 0
+    return db.execute(select(func.max(SchemaVersion.version))).scalar() or 0
+
+
+def pending_migrations(db: Session):
+    version = current_version(db)
+    return [(v, name) for v, name in available_migrations() if v > version]
+
+
+def upgrade(db: Session):
+    """Apply every pending migration; returns the versions applied"""
+    SchemaVersion.__table__.create(bind=db.connection(), checkfirst=True)
+    db.commit()
+
+    applied = []
+    for version, name in pending_migrations(db):
+        print(f"Applying migration {name}...")
+        module = importlib.import_module(f"migrations.{name}")
+        try:
+            module.upgrade(db)
+            db.add(SchemaVersion(version=version, name=name))
+            db.commit()
+        except Exception:
+            db.rollback()
+            print(f"Migration {name} failed; schema is at version {current_version(db)}")
+            raise
+        applied.append(version)
+    return applied
+
+
+def ensure_schema():
+    """Startup check: apply pending migrations (or just warn if MIGRATE_ON_STARTUP=0)"""
+    db = SessionLocal()
+    try:
+        pending = pending_migrations(db)
+        if not pending:
+            return
+        if not MIGRATE_ON_STARTUP:
+            print(f"Database schema is {len(pending)} migration(s) behind; run `python -m core.migrations upgrade`.")
+            return
+        upgrade(db)
+    finally:
+        db.close()
+
+
+# ---- helpers for migration scripts -------------------------------------------------
+
+def create_tables(db: Session, *models):
+    """CREATE TABLE (with its indexes) for models whose table does not exist yet"""
+    Base.metadata.create_all(bind=db.connection(), tables=[m.__table__ for m in models])
+
+
+def create_indexes(db: Session, model, names=None):
+    """CREATE INDEX for the model's declared indexes (or just `names`) that are missing"""
+    existing = {ix["name"] for ix in inspect(db.connection()).get_indexes(model.__tablename__)}
+    for index in model.__table__.indexes:
+        if index.name not in existing and (names is None or index.name in names):
+            index.create(bind=db.connection())
+
+
+def add_column(db: Session, model, column_name: str):
+    """ALTER TABLE ... ADD COLUMN for a column declared on the model but missing in the database"""
+    table = model.__table__
+    existing = {c["name"] for c in inspect(db.connection()).get_columns(table.name)}
+    if column_name in existing:
+        return False
+    ddl = CreateColumn(table.c[column_name]).compile(dialect=db.get_bind().dialect)
+    db.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+    return True
+
+
+if __name__ == "__main__":
+    # Migrations use the ORM; every mapper has to be importable when run as a script
+    import models.user, models.food_item, models.order, models.cart  # noqa: F401
+    command = sys.argv[1] if len(sys.argv) > 1 else "status"
+    db = SessionLocal()
+    try:
+        if command == "status":
+            version = current_version(db)
+            for v, name in available_migrations():
+                print(f"   [{'x' if v <= version else ' '}] {name}")
+            print(f"Schema version: {version}")
+        elif command == "upgrade":
+            applied = upgrade(db)
+            print(f"Applied {len(applied)} migration(s); schema version {current_version(db)}.")
+        else:
+            print("Usage: python -m core.migrations [status|upgrade]")
+            sys.exit(2)
+    finally:
+        db.close()
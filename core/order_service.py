@@ -0,0 +1,62 @@
+# core/order_service.py
+"""
+Customer order history, one page at a time.
+
+Pages are keyset-paginated on (created_at, id), newest first: a page is the
+orders strictly older than the last one shown, so fetching page 50 costs the
+same as page 1 (no OFFSET) and orders placed meanwhile never shift a page.
+Each page is two queries: the orders, then all their items joined to the
+menu for names, images and prices.
+"""
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+from models.food_item import FoodItem
+from models.order import Order, OrderItem
+
+ORDER_PAGE_SIZE = 10
+
+
+def get_order_page(db: Session, user_id: int, after=None, limit: int = ORDER_PAGE_SIZE):
+    """
+    The user's orders older than cursor `after` (None = newest):
+    {"orders": [{id, status, created_at, total_price, items: [...]}], "next": cursor}.
+    Pass "next" back as `after` for the following page; it is None on the
+    last page. Items whose menu item was deleted have name None.
+    """
+    query = (
+        select(Order.id, Order.status, Order.created_at, Order.total_price)
+        .where(Order.user_id == user_id)
+        .order_by(Order.created_at.desc(), Order.id.desc())
+        .limit(limit + 1)  # one extra row tells whether another page exists
+    )
+    if after is not None:
+        query = query.where(tuple_(Order.created_at, Order.id) < tuple_(*after))
+    rows = db.execute(query).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    orders = [
+        {"id": r.id, "status": r.status, "created_at": r.created_at, "total_price": r.total_price, "items": []}
+        for r in rows
+    ]
+    if orders:
+        by_id = {order["id"]: order for order in orders}
+        items = db.execute(
+            select(OrderItem.order_id, OrderItem.food_id, OrderItem.quantity, OrderItem.subtotal,
+                   FoodItem.name, FoodItem.image, FoodItem.price)
+            .outerjoin(FoodItem, FoodItem.id == OrderItem.food_id)
+            .where(OrderItem.order_id.in_(list(by_id)))
+            .order_by(OrderItem.order_id, OrderItem.id)
+        ).all()
+        for i in items:
+            by_id[i.order_id]["items"].append({
+                "food_id": i.food_id,
+                "name": i.name,
+                "image": i.image,
+                "price": i.price,
+                "quantity": i.quantity,
+                "subtotal": i.subtotal,
+            })
+
+    last = rows[-1] if rows else None
+    return {"orders": orders, "next": (last.created_at, last.id) if has_more else None}
@@ -0,0 +1,157 @@
+# core/query_metrics.py
+"""
+SQL instrumentation for the app engine (installed by core.db).
+
+Every statement is timed and attributed to the innermost view being rendered
+(`@track_queries` on a view / tab builder, or `with query_scope(name)`), or to
+the current route when no view is rendering (event handlers, worker threads).
+
+- query_stats(): per view/route totals (renders, queries, time, N+1 warnings)
+- N+1: the same statement shape running more than QUERY_N_PLUS_ONE_THRESHOLD
+  times in one render (one query_scope block) prints a warning. Queries
+  attributed to the route only add to its totals: separate clicks on the same
+  button are not an N+1, so wrap a handler in query_scope to check it
+- statements slower than SLOW_QUERY_MS are written to SLOW_QUERY_LOG
+"""
+import os
+import re
+import time
+import logging
+import threading
+import functools
+from contextlib import contextmanager
+from dotenv import load_dotenv
+from sqlalchemy import event
+
+load_dotenv()
+QUERY_METRICS = os.getenv("QUERY_METRICS", "1") == "1"
+QUERY_METRICS_VERBOSE = os.getenv("QUERY_METRICS_VERBOSE", "0") == "1"  # print a line per render
+QUERY_N_PLUS_ONE_THRESHOLD = int(os.getenv("QUERY_N_PLUS_ONE_THRESHOLD", "5"))
+QUERY_N_PLUS_ONE_WARN = os.getenv("QUERY_N_PLUS_ONE_WARN", "1") == "1"  # print a warning (always counted)
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", "slow_queries.log")
+
+_slow_log = logging.getLogger("pojangmacha.slow_queries")
+_slow_log.setLevel(logging.INFO)
+_slow_log.propagate = False
+_slow_handler = logging.FileHandler(SLOW_QUERY_LOG, delay=True)  # file is only created on the first slow query
+_slow_handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+_slow_log.addHandler(_slow_handler)
+
+_IN_LIST = re.compile(r"\b(IN)\s*\((?:\s*\?\s*,)+\s*\?\s*\)", re.IGNORECASE)  # IN (?, ?, ?) -> IN (?)
+
+
+class _Scope:
+    """Queries seen during one render of a view (or one visit of a route)"""
+
+    def __init__(self, name, check_n_plus_one=True):
+        self.name = name
+        self.check_n_plus_one = check_n_plus_one
+        self.queries = 0
+        self.total_ms = 0.0
+        self.shapes = {}  # statement shape -> count
+        self.n_plus_one = 0  # shapes that crossed the N+1 threshold
+
+
+_lock = threading.Lock()
+_local = threading.local()  # .scopes: stack of _Scope for renders running in this thread
+_route = {"scope": _Scope("(no route)", check_n_plus_one=False)}
+_stats = {}  # name -> {"renders", "queries", "total_ms", "max_ms", "n_plus_one"}
+
+
+def statement_shape(statement: str) -> str:
+    """Statement text with whitespace and expanded IN lists normalised"""
+    return _IN_LIST.sub(r"\1 (?)", " ".join(statement.split()))
+
+
+def _entry(name):
+    return _stats.setdefault(name, {"renders": 0, "queries": 0, "total_ms": 0.0, "max_ms": 0.0, "n_plus_one": 0})
+
+
+def _record(statement, parameters, elapsed_ms):
+    scopes = getattr(_local, "scopes", None)
+    shape = statement_shape(statement)
+    with _lock:
+        scope = scopes[-1] if scopes else _route["scope"]
+        scope.queries += 1
+        scope.total_ms += elapsed_ms
+        count = 0
+        if scope.check_n_plus_one:
+            count = scope.shapes[shape] = scope.shapes.get(shape, 0) + 1
+
+        entry = _entry(scope.name)
+        entry["queries"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+        n_plus_one = count == QUERY_N_PLUS_ONE_THRESHOLD + 1
+        if n_plus_one:
+            scope.n_plus_one += 1
+            entry["n_plus_one"] += 1
+
+    if n_plus_one and QUERY_N_PLUS_ONE_WARN:
+        print(f"⚠️ Possible N+1 in {scope.name}: statement ran {count}+ times: {shape[:200]}")
+    if elapsed_ms >= SLOW_QUERY_MS:
+        _slow_log.info("%.1f ms [%s] %s params=%s", elapsed_ms, scope.name, shape, str(parameters)[:200])
+
+
+@contextmanager
+def query_scope(name: str):
+    """Attribute the queries run inside the block (in this thread) to `name`"""
+    scope = _Scope(name)
+    scopes = _local.__dict__.setdefault("scopes", [])
+    scopes.append(scope)
+    try:
+        yield scope
+    finally:
+        scopes.pop()
+        with _lock:
+            _entry(name)["renders"] += 1
+        if QUERY_METRICS_VERBOSE and scope.queries:
+            print(f"[queries] {name}: {scope.queries} in {scope.total_ms:.1f} ms")
+
+
+def track_queries(func):
+    """Decorator: run a view / tab builder inside query_scope(func.__name__)"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with query_scope(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def set_query_route(route: str):
+    """Start attributing out-of-render queries to `route` (called on route change)"""
+    with _lock:
+        _route["scope"] = _Scope(route or "(no route)", check_n_plus_one=False)
+
+
+def query_stats():
+    """Copy of the per view/route totals"""
+    with _lock:
+        return {name: dict(entry) for name, entry in _stats.items()}
+
+
+def reset_query_stats():
+    with _lock:
+        _stats.clear()
+
+
+def install_query_metrics(engine):
+    """Time every statement the engine runs (no-op when QUERY_METRICS=0)"""
+    if not QUERY_METRICS:
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        _record(statement, parameters, (time.perf_counter() - started) * 1000)
+
+    @event.listens_for(engine, "handle_error")
+    def _discard_failed(context):
+        started = context.connection.info.get("query_started") if context.connection else None
+        if started:
+            started.pop()
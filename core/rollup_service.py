@@ -0,0 +1,282 @@
+# core/rollup_service.py
+"""
+Incrementally maintained sales rollups.
+
+Call record_order() / record_status_change() / remove_orders() on the same
+session that writes the orders, before commit, so the rollups land in the
+same transaction; committing it also invalidates the analytics cache.
+`python -m core.rollup_service rebuild` rebuilds them from
+raw history and `python -m core.rollup_service check` compares both.
+backfill_rollups() is the chunked variant used by migrations.
+"""
+import sys
+from datetime import datetime, date
+from sqlalchemy import select, update, delete, func, extract, case, false
+from sqlalchemy.orm import Session
+from core.db import Base, SessionLocal, upsert_insert
+from core.analytics_cache import invalidate_on_commit
+from models.order import Order, OrderItem
+from models.sales_rollup import SalesDaily, SalesHourly, SalesByItem
+
+ROLLUP_MODELS = (SalesDaily, SalesHourly, SalesByItem)
+
+# While backfill_rollups() runs in this process: orders with done < id <= last_id
+# are still to be counted by it, so _apply() leaves them alone
+_backfill = {"done": None, "last_id": None}
+
+
+def _awaiting_backfill(order_id: int) -> bool:
+    done, last_id = _backfill["done"], _backfill["last_id"]
+    return last_id is not None and done < order_id <= last_id
+
+
+def day_key(value) -> str:
+    """YYYY-MM-DD for a datetime/date, or a SQLite DATE() string"""
+    if isinstance(value, (datetime, date)):
+        return value.strftime("%Y-%m-%d")
+    return str(value)[:10]
+
+
+def _bump(db: Session, model, rows):
+    """
+    Add each row's values onto the rollup row with the same key (inserting
+    it if missing): one executemany upsert per model
+    """
+    if not rows:
+        return
+    key_names = [c.name for c in model.__table__.primary_key.columns]
+    stmt = upsert_insert(db, model)
+    updates = {name: getattr(model, name) + stmt.excluded[name]
+               for name in rows[0] if name not in key_names and name != "first_item_id"}
+    if "first_item_id" in rows[0]:
+        updates["first_item_id"] = case(
+            (stmt.excluded.first_item_id < model.first_item_id, stmt.excluded.first_item_id),
+            else_=model.first_item_id
+        )
+    db.execute(stmt.on_conflict_do_update(index_elements=key_names, set_=updates), rows)
+
+
+def _add_to(rows: dict, keys: dict, values: dict):
+    """Accumulate `values` into rows[key] in memory, so each key is upserted once"""
+    key = tuple(keys.values())
+    row = rows.get(key)
+    if row is None:
+        rows[key] = {**keys, **values}
+        return
+    for name, value in values.items():
+        row[name] = min(row[name], value) if name == "first_item_id" else row[name] + value
+
+
+def _apply(db: Session, orders, sign: int, status=None):
+    """Add (sign=1) or subtract (sign=-1) orders and their items from every rollup"""
+    by_id = {o.id: o for o in orders if not _awaiting_backfill(o.id)}
+    if not by_id:
+        return
+    invalidate_on_commit(db)
+
+    daily, hourly, by_item = {}, {}, {}
+    for order in by_id.values():
+        bucket = status or order.status
+        totals = {"order_count": sign, "revenue": sign * order.total_price}
+        _add_to(daily, {"day": day_key(order.created_at), "status": bucket}, totals)
+        _add_to(hourly, {"hour": order.created_at.hour, "status": bucket}, totals)
+
+    # One grouped read for all the items of these orders
+    item_totals = db.execute(
+        select(
+            OrderItem.order_id,
+            OrderItem.food_id,
+            func.sum(OrderItem.quantity),
+            func.sum(OrderItem.subtotal),
+            func.min(OrderItem.id)
+        )
+        .where(OrderItem.order_id.in_(list(by_id)))
+        .group_by(OrderItem.order_id, OrderItem.food_id)
+    ).all()
+    for order_id, food_id, quantity, revenue, first_item_id in item_totals:
+        _add_to(by_item, {"food_id": food_id, "status": status or by_id[order_id].status},
+                {"quantity": sign * quantity, "revenue": sign * revenue, "first_item_id": first_item_id})
+
+    _bump(db, SalesDaily, list(daily.values()))
+    _bump(db, SalesHourly, list(hourly.values()))
+    _bump(db, SalesByItem, list(by_item.values()))
+
+    if sign < 0:
+        # Drop buckets that no longer hold any sales
+        db.execute(delete(SalesDaily).where(SalesDaily.order_count <= 0))
+        db.execute(delete(SalesHourly).where(SalesHourly.order_count <= 0))
+        db.execute(delete(SalesByItem).where(SalesByItem.quantity <= 0))
+
+
+def record_order(db: Session, order: Order):
+    """Add a new order (flushed, with its items) to the rollups"""
+    _apply(db, [order], 1)
+
+
+def record_status_change(db: Session, order: Order, old_status: str):
+    """Move an order's totals from its old status bucket to order.status"""
+    if old_status == order.status:
+        return
+    _apply(db, [order], -1, status=old_status)
+    _apply(db, [order], 1)
+
+
+def remove_orders(db: Session, orders):
+    """Subtract orders that are about to be deleted"""
+    _apply(db, orders, -1)
+
+
+def _hold_write_lock(db: Session):
+    """
+    Start the session's write transaction now (a no-op UPDATE), so reads that
+    follow see every committed order and no other writer commits until ours
+    does. On SQLite a bare SELECT would run outside any transaction.
+    """
+    db.execute(update(SalesDaily).where(false()).values(order_count=SalesDaily.order_count))
+
+
+def compute_rollups(db: Session, after_id: int = None, through_id: int = None):
+    """
+    Aggregate raw orders into rollup rows: {model: [row dict, ...]}
+    after_id / through_id limit it to orders with after_id < id <= through_id.
+    """
+    day_col = func.date(Order.created_at)
+    hour_col = extract("hour", Order.created_at)
+    id_range = []
+    if after_id is not None:
+        id_range.append(Order.id > after_id)
+    if through_id is not None:
+        id_range.append(Order.id <= through_id)
+    return {
+        SalesDaily: [
+            {"day": day_key(day), "status": status, "order_count": count, "revenue": revenue}
+            for day, status, count, revenue in db.execute(
+                select(day_col, Order.status, func.count(Order.id), func.sum(Order.total_price))
+                .where(*id_range)
+                .group_by(day_col, Order.status)
+            )
+        ],
+        SalesHourly: [
+            {"hour": int(hour), "status": status, "order_count": count, "revenue": revenue}
+            for hour, status, count, revenue in db.execute(
+                select(hour_col, Order.status, func.count(Order.id), func.sum(Order.total_price))
+                .where(*id_range)
+                .group_by(hour_col, Order.status)
+            )
+        ],
+        SalesByItem: [
+            {"food_id": food_id, "status": status, "quantity": quantity, "revenue": revenue, "first_item_id": first_item_id}
+            for food_id, status, quantity, revenue, first_item_id in db.execute(
+                select(OrderItem.food_id, Order.status, func.sum(OrderItem.quantity),
+                       func.sum(OrderItem.subtotal), func.min(OrderItem.id))
+                .join(Order, Order.id == OrderItem.order_id)
+                .where(*id_range)
+                .group_by(OrderItem.food_id, Order.status)
+            )
+        ],
+    }
+
+
+def rebuild_rollups(db: Session):
+    """Replace every rollup with totals recomputed from raw history, then commit"""
+    Base.metadata.create_all(bind=db.get_bind(), tables=[m.__table__ for m in ROLLUP_MODELS])
+    invalidate_on_commit(db)
+    for model in ROLLUP_MODELS:
+        db.execute(delete(model))
+    rows = compute_rollups(db)  # after the deletes: no order can commit in between
+    for model in ROLLUP_MODELS:
+        if rows[model]:
+            db.execute(model.__table__.insert(), rows[model])
+    db.commit()
+    return {model.__tablename__: len(rows[model]) for model in ROLLUP_MODELS}
+
+
+def backfill_rollups(db: Session, chunk_size: int = 5000):
+    """
+    Rebuild the rollups chunk by chunk: each transaction adds at most
+    `chunk_size` orders (by id), so the write lock is released between chunks.
+    Orders placed after the backfill starts (id above the max id read with the
+    deletes) are recorded by record_order() as usual; status changes to orders
+    it has not reached yet are skipped by _apply(), since the backfill counts
+    them under their current status. Drift from writes in other processes is
+    repaired by a final check_rollups() / rebuild. Returns the number of
+    chunks committed.
+    """
+    Base.metadata.create_all(bind=db.get_bind(), tables=[m.__table__ for m in ROLLUP_MODELS])
+    invalidate_on_commit(db)
+    for model in ROLLUP_MODELS:
+        db.execute(delete(model))
+    # Same transaction as the deletes: every order up to last_id is the backfill's
+    last_id = db.execute(select(func.max(Order.id))).scalar() or 0
+    _backfill.update(done=0, last_id=last_id)
+    try:
+        db.commit()
+        chunks = 0
+        while _backfill["done"] < last_id:
+            upto = min(_backfill["done"] + chunk_size, last_id)
+            _hold_write_lock(db)  # no status change can slip between the read and the commit
+            for model, rows in compute_rollups(db, after_id=_backfill["done"], through_id=upto).items():
+                _bump(db, model, rows)
+            invalidate_on_commit(db)
+            db.commit()
+            _backfill["done"], chunks = upto, chunks + 1
+    finally:
+        _backfill.update(done=None, last_id=None)
+
+    _hold_write_lock(db)
+    mismatches = check_rollups(db)
+    if mismatches:
+        print(f"   {len(mismatches)} rollup rows drifted during the backfill; rebuilding")
+        rebuild_rollups(db)
+    else:
+        db.commit()
+    return chunks
+
+
+def check_rollups(db: Session):
+    """
+    Compare stored rollups with raw history.
+    Returns a list of (table, key, stored, expected) mismatches; empty means in sync.
+    """
+    mismatches = []
+    for model, expected_rows in compute_rollups(db).items():
+        key_names = [c.name for c in model.__table__.primary_key.columns]
+        # first_item_id is only a tie-break hint and may lag after status changes
+        value_names = [c.name for c in model.__table__.columns if c.name not in key_names and c.name != "first_item_id"]
+
+        def index(rows):
+            return {tuple(r[k] for k in key_names): r for r in rows}
+
+        expected = index(expected_rows)
+        stored = index(dict(r._mapping) for r in db.execute(select(model.__table__)))
+        for key in sorted(set(expected) | set(stored), key=str):
+            want, have = expected.get(key), stored.get(key)
+            if want is None or have is None or any(
+                abs((want[v] or 0) - (have[v] or 0)) > 1e-6 for v in value_names
+            ):
+                mismatches.append((model.__tablename__, key, have, want))
+    return mismatches
+
+
+if __name__ == "__main__":
+    # Order's relationships need these mappers when run as a script
+    import models.user, models.food_item, models.cart  # noqa: F401
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+    db = SessionLocal()
+    try:
+        if command == "rebuild":
+            counts = rebuild_rollups(db)
+            print("Rollups rebuilt:")
+            for table, count in counts.items():
+                print(f"   - {table}: {count} rows")
+        elif command == "check":
+            mismatches = check_rollups(db)
+            for table, key, stored, expected in mismatches:
+                print(f"{table} {key}: stored={stored} expected={expected}")
+            print("Rollups match raw history." if not mismatches else f"{len(mismatches)} rollup mismatches.")
+            sys.exit(1 if mismatches else 0)
+        else:
+            print("Usage: python -m core.rollup_service [rebuild|check]")
+            sys.exit(2)
+    finally:
+        db.close()
@@ -69,9 +69,9 @@ def check_any_active_lockout(db):
     """Check if there's ANY active lockout in the system"""
     from models.login_attempt import LoginAttempt
     
-    # Get all locked accounts
+    # Only lockouts that have not expired yet (searchable on the locked_until index)
     locked_attempts = db.query(LoginAttempt).filter(
-        LoginAttempt.locked_until.isnot(None)
+        LoginAttempt.locked_until > datetime.utcnow()
     ).all()
     
     for attempt in locked_attempts:
@@ -0,0 +1,79 @@
+# core/session_registry.py
+"""
+SQLAlchemy session lifecycle for Flet views.
+
+- page_session(page, scope): session owned by the page's current route. Opening
+  the same scope again (e.g. re-rendering a home tab) closes the previous one.
+- close_page_sessions(page): called on route change / page.clean() / page close,
+  so sessions from screens that are gone release their connections.
+- thread_session(): a private session for a background thread, closed when the
+  `with` block exits. Never share a view's session with a worker thread.
+- session_stats(): open session and checked-out connection counts.
+"""
+import threading
+from contextlib import contextmanager
+from core.db import SessionLocal, engine
+
+_lock = threading.Lock()
+_page_sessions = {}      # page key -> {(route, scope): Session}
+_thread_sessions = {"open": 0}
+
+
+def _page_key(page):
+    return getattr(page, "session_id", None) or id(page)
+
+
+def page_session(page, scope: str = "view"):
+    """Return a new session registered to page.route + scope"""
+    db = SessionLocal()
+    key = (page.route, scope)
+    with _lock:
+        sessions = _page_sessions.setdefault(_page_key(page), {})
+        previous = sessions.get(key)
+        sessions[key] = db
+    if previous is not None:
+        previous.close()
+    return db
+
+
+def close_page_sessions(page, keep_route: str = None):
+    """Close the page's sessions, except those opened for `keep_route`"""
+    with _lock:
+        sessions = _page_sessions.get(_page_key(page), {})
+        stale = [key for key in sessions if key[0] != keep_route]
+        closing = [sessions.pop(key) for key in stale]
+        if not sessions:
+            _page_sessions.pop(_page_key(page), None)
+    for db in closing:
+        try:
+            db.close()
+        except Exception as ex:
+            print(f"Session close error: {ex}")
+    return len(closing)
+
+
+@contextmanager
+def thread_session():
+    """Session private to the calling (background) thread"""
+    db = SessionLocal()
+    with _lock:
+        _thread_sessions["open"] += 1
+    try:
+        yield db
+    finally:
+        db.close()
+        with _lock:
+            _thread_sessions["open"] -= 1
+
+
+def session_stats():
+    """Counts of registered view sessions, thread sessions and checked-out pool connections"""
+    with _lock:
+        view_sessions = sum(len(s) for s in _page_sessions.values())
+        thread_sessions = _thread_sessions["open"]
+    checkedout = getattr(engine.pool, "checkedout", None)
+    return {
+        "view_sessions": view_sessions,
+        "thread_sessions": thread_sessions,
+        "checked_out_connections": checkedout() if checkedout else None,
+    }
@@ -0,0 +1,230 @@
+# core/upload_store.py
+"""
+Content-addressed storage for uploaded food and profile images.
+
+store_upload() names every upload after the sha256 of its bytes
+(`<digest>.<ext>`), so uploading the same picture twice keeps one file and a
+file name never changes content (clients may cache it forever). Two uploads
+can no longer overwrite each other just because they share a name.
+
+Files are shared by every row that references them. release_upload() deletes
+a file (and its thumbnails) once no FoodItem.image or User.profile_picture
+refers to it any more; views call it after committing a replace or delete.
+A file a view has stored but not yet saved is "pending": the view calls
+keep_upload() once a committed row refers to it, or discard_upload() when the
+pick is replaced or the dialog cancelled, which deletes it straight away.
+collect_garbage() sweeps the upload directories for files nothing refers to
+(other processes' leftovers, releases deferred by the grace period); the app
+runs it at startup and every UPLOAD_GC_INTERVAL_SECONDS (start_upload_gc()).
+Only content-addressed files and thumbnails are swept: older uploads named
+after the original file are left alone.
+
+    python -m core.upload_store gc            # list unreferenced files
+    python -m core.upload_store gc --delete   # and delete them
+"""
+import os
+import re
+import sys
+import time
+import hashlib
+import shutil
+import threading
+from dotenv import load_dotenv
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+from models.food_item import FoodItem
+from models.user import User
+from core.image_service import THUMBNAIL_NAME, remove_thumbnails
+from core.asset_manifest import register_asset, forget_asset
+from core.session_registry import thread_session
+
+load_dotenv()
+# Files younger than this are never collected: they may have just been picked
+# in a dialog that has not been saved yet
+UPLOAD_GC_GRACE_SECONDS = int(os.getenv("UPLOAD_GC_GRACE_SECONDS", "3600"))
+UPLOAD_GC_INTERVAL_SECONDS = int(os.getenv("UPLOAD_GC_INTERVAL_SECONDS", "3600"))  # 0: startup sweep only
+
+FOOD_UPLOAD_DIR = "assets/uploads/foods"
+PROFILE_UPLOAD_DIR = "assets/profile_images"
+UPLOAD_DIRS = (FOOD_UPLOAD_DIR, PROFILE_UPLOAD_DIR)
+
+_STORED_NAME = re.compile(r"^[0-9a-f]{64}\.[a-z0-9]+$")
+_EXTENSIONS = {".jpeg": ".jpg"}
+
+_pending = {}  # path -> stores in this process not yet kept or discarded
+_pending_lock = threading.Lock()
+_gc_timer = {"timer": None}
+
+
+def _digest(path: str) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def is_stored_upload(path: str) -> bool:
+    """True for files named by store_upload() inside an upload directory"""
+    if not path:
+        return False
+    directory, name = os.path.split(os.path.normpath(path))
+    return directory in {os.path.normpath(d) for d in UPLOAD_DIRS} and bool(_STORED_NAME.match(name))
+
+
+def store_upload(src: str, upload_dir: str) -> str:
+    """
+    Copy `src` into `upload_dir` under its content hash; returns the stored
+    path, pending until keep_upload() or discard_upload()
+    """
+    os.makedirs(upload_dir, exist_ok=True)
+    ext = os.path.splitext(src)[1].lower()
+    dest = os.path.join(upload_dir, f"{_digest(src)}{_EXTENSIONS.get(ext, ext)}")
+    with _pending_lock:
+        _pending[dest] = _pending.get(dest, 0) + 1
+    if os.path.exists(dest):
+        os.utime(dest)  # already stored; a fresh mtime keeps it out of a concurrent release/sweep
+        register_asset(dest)
+        return dest
+    tmp = f"{dest}.{os.getpid()}.tmp"
+    shutil.copyfile(src, tmp)
+    os.replace(tmp, dest)
+    register_asset(dest)
+    return dest
+
+
+def _unpend(path: str):
+    with _pending_lock:
+        count = _pending.get(path, 0) - 1
+        if count > 0:
+            _pending[path] = count
+        else:
+            _pending.pop(path, None)
+
+
+def keep_upload(path: str):
+    """A committed row now refers to this store_upload() result"""
+    if path:
+        _unpend(path)
+
+
+def discard_upload(db: Session, path: str):
+    """Drop a store_upload() result that will not be saved (replaced pick, cancelled dialog)"""
+    if path:
+        _unpend(path)
+        release_upload(db, path, stored_here=True)
+
+
+def reference_count(db: Session, path: str) -> int:
+    """Rows whose image or profile picture is `path`"""
+    foods = db.execute(select(func.count()).where(FoodItem.image == path)).scalar()
+    users = db.execute(select(func.count()).where(User.profile_picture == path)).scalar()
+    return foods + users
+
+
+def _recent(path: str) -> bool:
+    return time.time() - os.path.getmtime(path) < UPLOAD_GC_GRACE_SECONDS
+
+
+def release_upload(db: Session, path: str, stored_here: bool = False) -> bool:
+    """
+    Delete a stored upload and its thumbnails if nothing references it any
+    more. Call after committing the change that dropped the reference.
+    Unless the caller stored the file itself (`stored_here`), a file younger
+    than the grace period is left for the sweep: another process may have
+    just stored the same image for a dialog it has not saved yet.
+    """
+    if not is_stored_upload(path) or not os.path.exists(path):
+        return False
+    with _pending_lock:
+        if _pending.get(path):
+            return False  # picked in another dialog that has not been saved yet
+    try:
+        if reference_count(db, path) or (not stored_here and _recent(path)):
+            return False
+        os.remove(path)
+        forget_asset(path)
+        remove_thumbnails(path)
+    except OSError as ex:
+        print(f"Could not release upload {path}: {ex}")
+        return False
+    return True
+
+
+def referenced_uploads(db: Session):
+    """Normalised paths of every image referenced by a food item or user"""
+    paths = db.execute(select(FoodItem.image).where(FoodItem.image.isnot(None))).scalars().all()
+    paths += db.execute(select(User.profile_picture).where(User.profile_picture.isnot(None))).scalars().all()
+    return {os.path.normpath(p) for p in paths if p}
+
+
+def find_garbage(db: Session):
+    """(path, bytes) of every unreferenced stored upload and thumbnail past the grace period"""
+    referenced = referenced_uploads(db)
+    referenced_stems = {os.path.splitext(p)[0] for p in referenced}
+    garbage = []
+    for upload_dir in UPLOAD_DIRS:
+        if not os.path.isdir(upload_dir):
+            continue
+        for name in sorted(os.listdir(upload_dir)):
+            path = os.path.normpath(os.path.join(upload_dir, name))
+            if not os.path.isfile(path):
+                continue
+            thumb = THUMBNAIL_NAME.match(name)
+            if thumb:
+                # A thumbnail lives as long as some original with its stem is referenced
+                orphan = os.path.join(upload_dir, thumb.group("stem")) not in referenced_stems
+            else:
+                orphan = bool(_STORED_NAME.match(name)) and path not in referenced
+            if orphan and not _recent(path) and not _pending.get(path):
+                garbage.append((path, os.path.getsize(path)))
+    return garbage
+
+
+def collect_garbage(db: Session, delete: bool = False):
+    """find_garbage(), removing the files when delete=True; returns the (path, bytes) list"""
+    garbage = find_garbage(db)
+    if delete:
+        for path, _ in garbage:
+            try:
+                os.remove(path)
+                forget_asset(path)
+            except OSError as ex:
+                print(f"   {path}: {ex}")
+    return garbage
+
+
+def start_upload_gc(interval: int = UPLOAD_GC_INTERVAL_SECONDS):
+    """Sweep now, then every `interval` seconds on a daemon timer (0: only now)"""
+    try:
+        with thread_session() as db:
+            garbage = collect_garbage(db, delete=True)
+        if garbage:
+            print(f"Upload sweep removed {len(garbage)} unreferenced file(s), "
+                  f"{sum(size for _, size in garbage) / 1024:.1f} KiB")
+    except Exception as ex:
+        print(f"Upload sweep failed: {ex}")
+    if interval > 0:
+        timer = threading.Timer(interval, start_upload_gc, args=(interval,))
+        timer.name = "upload-gc"
+        timer.daemon = True
+        _gc_timer["timer"] = timer
+        timer.start()
+
+
+if __name__ == "__main__":
+    from core.db import SessionLocal
+    import models.order, models.cart  # noqa: F401  (mappers for the queries above)
+    if len(sys.argv) < 2 or sys.argv[1] != "gc":
+        print("Usage: python -m core.upload_store gc [--delete]")
+        sys.exit(2)
+    delete = "--delete" in sys.argv[2:]
+    db = SessionLocal()
+    try:
+        garbage = collect_garbage(db, delete=delete)
+        for path, size in garbage:
+            print(f"   {size:>10}  {path}")
+        action = "Deleted" if delete else "Unreferenced (run with --delete to remove)"
+        print(f"{action}: {len(garbage)} file(s), {sum(size for _, size in garbage) / 1024:.1f} KiB.")
+    finally:
+        db.close()
@@ -1,3 +1,4 @@
+import sys
 from core.db import Base, engine, SessionLocal
 from models.user import User
 from models.food_item import FoodItem
@@ -5,7 +6,10 @@ from models.order import Order, OrderItem
 from models.cart import Cart
 from models.audit_log import AuditLog
 from models.login_attempt import LoginAttempt
+from models.sales_rollup import SalesDaily, SalesHourly, SalesByItem
+from models.schema_version import SchemaVersion
 from core.user_service import create_default_admin
+from core.migrations import upgrade, current_version
 
 def seed_food_items(db):
     existing = db.query(FoodItem).first()
@@ -26,11 +30,17 @@ def seed_food_items(db):
     else:
         print("Food items already seeded.")
 
-def init_db():
-    print("Rebuilding database (drop/create)...")
-    Base.metadata.drop_all(bind=engine)
-    Base.metadata.create_all(bind=engine)
-    print("All tables created:")
+def init_db(reset=False):
+    if reset:
+        # Destructive: only with an explicit --reset
+        print("Rebuilding database (drop/create)...")
+        Base.metadata.drop_all(bind=engine)
+    
+    db = SessionLocal()
+    
+    # Creates missing tables and applies pending migrations; existing data is kept
+    upgrade(db)
+    print(f"Schema is at version {current_version(db)}. Tables:")
     print("   - users")
     print("   - food_items")
     print("   - orders")
@@ -38,8 +48,8 @@ def init_db():
     print("   - carts")
     print("   - audit_logs")
     print("   - login_attempts") 
-    
-    db = SessionLocal()
+    print("   - sales_daily / sales_hourly / sales_by_item")
+    print("   - schema_version")
     
     # Create default admin
     create_default_admin(db)
@@ -52,4 +62,4 @@ def init_db():
     print("Default admin: admin@pojangmacha.com / admin123")
 
 if __name__ == "__main__":
-    init_db()
\ No newline at end of file
+    init_db(reset="--reset" in sys.argv)
\ No newline at end of file
@@ -14,9 +14,17 @@ from models.order import Order, OrderItem
 from models.cart import Cart
 from models.audit_log import AuditLog
 from models.login_attempt import LoginAttempt
+from models.sales_rollup import SalesDaily, SalesHourly, SalesByItem
 
 # Import core services
 from core.session_manager import start_session, end_session, is_session_active, refresh_session
+from core.session_registry import close_page_sessions, session_stats
+from core.cart_buffer import flush_cart, unwatch_cart
+from core.migrations import ensure_schema
+from core.catalog_cache import load_catalog
+from core.asset_manifest import load_manifest, start_asset_watcher, ASSET_WATCH
+from core.upload_store import start_upload_gc
+from core.query_metrics import set_query_route
 
 # Import views
 from ui.splash_view import splash_view
@@ -93,6 +101,13 @@ def main(page: ft.Page):
         u = page.session.get("user")
         return u.get("email") if u else None
 
+    def flush_user_cart():
+        # Queued cart changes are written before the user's session goes away
+        u = page.session.get("user")
+        if u and u.get("id"):
+            flush_cart(u["id"])
+            unwatch_cart(u["id"])
+
     def close_warning_dialog():
         try:
             if hasattr(page, "dialog") and page.dialog:
@@ -154,6 +169,21 @@ def main(page: ft.Page):
     
     page.update = activity_aware_update
 
+    original_clean = page.clean
+
+    def lifecycle_aware_clean(*args, **kwargs):
+        # Screens being torn down release their DB sessions; the current route keeps its own
+        close_page_sessions(page, keep_route=page.route)
+        return original_clean(*args, **kwargs)
+
+    page.clean = lifecycle_aware_clean
+
+    try:
+        if hasattr(page, "on_close"):
+            page.on_close = lambda e: (flush_user_cart(), close_page_sessions(page))
+    except Exception as ex:
+        print(f"Close handler error: {ex}")
+
     def show_warning_dialog(remaining_seconds):
         if warning_dialog_shown["value"]:
             return
@@ -251,6 +281,7 @@ def main(page: ft.Page):
         countdown_thread.start()
 
     def force_logout():
+        flush_user_cart()
         email = current_email()
         if email:
             try:
@@ -330,6 +361,12 @@ def main(page: ft.Page):
             splash_view(page, on_splash_complete)
             return
         
+        closed = close_page_sessions(page, keep_route=page.route)
+        set_query_route(page.route)
+        stats = session_stats()
+        print(f"Route {page.route}: closed {closed} DB session(s); "
+              f"{stats['view_sessions']} view / {stats['thread_sessions']} thread sessions open, "
+              f"{stats['checked_out_connections']} connections checked out")
         page.clean()
         current_user = page.session.get("user")
 
@@ -386,6 +423,7 @@ def main(page: ft.Page):
                     print(f"Session initialization error: {ex}")
 
         if page.route == "/logout":
+            flush_user_cart()
             cur = page.session.get("user")
             if cur and cur.get("email"):
                 try:
@@ -428,4 +466,10 @@ def main(page: ft.Page):
     page.go("/")
 
 if __name__ == "__main__":
+    ensure_schema()
+    load_catalog()
+    load_manifest()
+    if ASSET_WATCH:
+        start_asset_watcher()
+    start_upload_gc()
     ft.app(target=main)
\ No newline at end of file
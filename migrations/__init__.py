@@ -0,0 +1,3 @@
+# Ordered schema migrations, applied by core.migrations.
+# Add new ones as mNNNN_<short_name>.py with an `upgrade(db)` function that
+# only makes additive changes and is safe to re-run.
@@ -0,0 +1,13 @@
+"""Tables that init_db.py used to create with drop_all/create_all"""
+from core.migrations import create_tables
+from models.user import User
+from models.food_item import FoodItem
+from models.order import Order, OrderItem
+from models.cart import Cart
+from models.audit_log import AuditLog
+from models.login_attempt import LoginAttempt
+
+
+def upgrade(db):
+    # No-op on databases created by the old init_db; creates everything on a new one
+    create_tables(db, User, FoodItem, Order, OrderItem, Cart, AuditLog, LoginAttempt)
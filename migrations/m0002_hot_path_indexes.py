@@ -0,0 +1,38 @@
+"""Indexes for the hot query paths and the unique (user_id, food_id) cart index"""
+from sqlalchemy import select, update, delete, func
+from core.migrations import create_indexes
+from models.food_item import FoodItem
+from models.order import Order, OrderItem
+from models.cart import Cart
+from models.login_attempt import LoginAttempt
+
+# The indexes this migration owns; indexes declared on these models later are
+# created by their own migration (after any column they need exists)
+INDEXES = {
+    Order: {"ix_orders_user_id_created_at", "ix_orders_created_at"},
+    OrderItem: {"ix_order_items_order_id", "ix_order_items_food_id"},
+    Cart: {"uq_carts_user_id_food_id"},
+    LoginAttempt: {"ix_login_attempts_success_attempt_time", "ix_login_attempts_email_locked_until",
+                   "ix_login_attempts_locked_until"},
+    FoodItem: {"ix_food_items_name", "ix_food_items_category"},
+}
+
+
+def _merge_duplicate_cart_rows(db):
+    """Fold duplicate (user_id, food_id) cart rows into the oldest one"""
+    duplicates = db.execute(
+        select(func.min(Cart.id), func.sum(Cart.quantity), Cart.user_id, Cart.food_id)
+        .group_by(Cart.user_id, Cart.food_id)
+        .having(func.count(Cart.id) > 1)
+    ).all()
+    for keep_id, quantity, user_id, food_id in duplicates:
+        db.execute(update(Cart).where(Cart.id == keep_id).values(quantity=quantity))
+        db.execute(delete(Cart).where(Cart.user_id == user_id, Cart.food_id == food_id, Cart.id != keep_id))
+    if duplicates:
+        print(f"   merged {len(duplicates)} duplicate cart rows")
+
+
+def upgrade(db):
+    _merge_duplicate_cart_rows(db)
+    for model, names in INDEXES.items():
+        create_indexes(db, model, names=names)
@@ -0,0 +1,11 @@
+"""Sales rollup tables, backfilled from order history in chunks"""
+from core.migrations import create_tables, MIGRATION_CHUNK_SIZE
+from core.rollup_service import backfill_rollups
+from models.sales_rollup import SalesDaily, SalesHourly, SalesByItem
+
+
+def upgrade(db):
+    create_tables(db, SalesDaily, SalesHourly, SalesByItem)
+    db.commit()
+    chunks = backfill_rollups(db, chunk_size=MIGRATION_CHUNK_SIZE)
+    print(f"   backfilled rollups in {chunks} chunk(s)")
@@ -0,0 +1,8 @@
+"""Idempotency key column on orders, unique so a checkout is placed at most once"""
+from core.migrations import add_column, create_indexes
+from models.order import Order
+
+
+def upgrade(db):
+    add_column(db, Order, "checkout_token")
+    create_indexes(db, Order, names={"uq_orders_checkout_token"})
@@ -0,0 +1,7 @@
+"""FTS5 index over food_items (name, description, category) with sync triggers"""
+from core.menu_search import install_menu_search
+
+
+def upgrade(db):
+    if install_menu_search(db):
+        print("   menu search index built")
@@ -0,0 +1,7 @@
+"""(status, created_at) index on orders for the admin orders board's status filter"""
+from core.migrations import create_indexes
+from models.order import Order
+
+
+def upgrade(db):
+    create_indexes(db, Order, names={"ix_orders_status_created_at"})
@@ -1,10 +1,15 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from core.db import Base
 
 class Cart(Base):
     __tablename__ = "carts"
+    __table_args__ = (
+        # One row per (user, food); also serves user_id lookups. A unique index
+        # rather than a table constraint so migrations can add it in place.
+        Index("uq_carts_user_id_food_id", "user_id", "food_id", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -6,8 +6,8 @@ class FoodItem(Base):
     __tablename__ = "food_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
     description = Column(String)
-    category = Column(String)  # Ramen, Buldak, Rice Bowl, Drinks
+    category = Column(String, index=True)  # Ramen, Buldak, Rice Bowl, Drinks
     price = Column(Float, nullable=False)
     image = Column(String, nullable=True)  # store path of image
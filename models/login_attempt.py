@@ -1,9 +1,14 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index
 from datetime import datetime
 from core.db import Base
 
 class LoginAttempt(Base):
     __tablename__ = "login_attempts"
+    __table_args__ = (
+        Index("ix_login_attempts_success_attempt_time", "success", "attempt_time"),  # failed attempts window
+        Index("ix_login_attempts_email_locked_until", "email", "locked_until"),  # global lockout lookup
+        Index("ix_login_attempts_locked_until", "locked_until"),  # any active lockout
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, index=True, nullable=False)
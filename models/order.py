@@ -1,16 +1,23 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from core.db import Base
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        Index("ix_orders_user_id_created_at", "user_id", "created_at"),  # order history
+        Index("ix_orders_created_at", "created_at"),  # analytics date ranges
+        Index("ix_orders_status_created_at", "status", "created_at"),  # admin orders board status filter
+        Index("uq_orders_checkout_token", "checkout_token", unique=True),  # checkout idempotency
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     total_price = Column(Float, nullable=False)
     status = Column(String, default="Pending")
     created_at = Column(DateTime, default=datetime.utcnow)
+    checkout_token = Column(String(64), nullable=True)  # idempotency key of the checkout that created it
     
     # Relationships
     user = relationship("User", back_populates="orders")
@@ -19,6 +26,11 @@ class Order(Base):
 
 class OrderItem(Base):
     __tablename__ = "order_items"
+    __table_args__ = (
+        # Covers items-by-order reads and the per-order rollup aggregation
+        Index("ix_order_items_order_id", "order_id", "food_id", "quantity", "subtotal"),
+        Index("ix_order_items_food_id", "food_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
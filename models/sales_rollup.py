@@ -0,0 +1,34 @@
+# models/sales_rollup.py
+from sqlalchemy import Column, Integer, String, Float
+from core.db import Base
+
+# Pre-aggregated sales, maintained by core.rollup_service in the same
+# transaction as the order writes. Every rollup is split by order status
+# so a status change just moves totals from one bucket to another.
+
+class SalesDaily(Base):
+    __tablename__ = "sales_daily"
+
+    day = Column(String, primary_key=True)  # YYYY-MM-DD
+    status = Column(String, primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+
+
+class SalesHourly(Base):
+    __tablename__ = "sales_hourly"
+
+    hour = Column(Integer, primary_key=True)  # 0-23
+    status = Column(String, primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+
+
+class SalesByItem(Base):
+    __tablename__ = "sales_by_item"
+
+    food_id = Column(Integer, primary_key=True)
+    status = Column(String, primary_key=True)
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+    first_item_id = Column(Integer, nullable=False)  # lowest order_items.id, keeps best-seller ties stable
@@ -0,0 +1,12 @@
+# models/schema_version.py
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from core.db import Base
+
+class SchemaVersion(Base):
+    """One row per applied migration (see core.migrations)"""
+    __tablename__ = "schema_version"
+
+    version = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow)
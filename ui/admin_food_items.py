@@ -2,6 +2,7 @@
 Food Items Management Tab for Admin Panel
 """
 import flet as ft
+from core.query_metrics import track_queries
 from models.food_item import FoodItem
 from models.audit_log import AuditLog
 from ui.admin_constants import (
@@ -9,8 +10,12 @@ from ui.admin_constants import (
     GRID_SPACING, GRID_RUN_SPACING
 )
 from ui.admin_utils import close_dialog
-import os
+from core.catalog_cache import invalidate_catalog
+from core.image_service import thumbnail_for, make_thumbnails_async, THUMB_MENU
+from core.upload_store import store_upload, keep_upload, discard_upload, release_upload, FOOD_UPLOAD_DIR
+from core.asset_manifest import asset_exists
 
+@track_queries
 def build_food_items_tab(page: ft.Page, db, user_data: dict, is_desktop: bool):
     """
     Build the Food Items management tab
@@ -43,12 +48,12 @@ def build_food_items_tab(page: ft.Page, db, user_data: dict, is_desktop: bool):
                     # Image (left side)
                     ft.Container(
                         content=ft.Image(
-                            src=item.image,
+                            src=thumbnail_for(item.image, THUMB_MENU),
                             width=80,
                             height=80,
                             fit=ft.ImageFit.COVER,
                             border_radius=8
-                        ) if item.image else ft.Container(
+                        ) if asset_exists(item.image) else ft.Container(
                             width=80,
                             height=80,
                             bgcolor="grey300",
@@ -142,6 +147,7 @@ def build_food_items_tab(page: ft.Page, db, user_data: dict, is_desktop: bool):
         message = ft.Text("", color="red")
         
         uploaded_image_path = {"value": ""}
+        picked = {"path": None}  # stored by this dialog, not saved yet
         
         image_preview = ft.Container(
             content=ft.Text("No image selected", size=12, color="grey"),
@@ -155,16 +161,14 @@ def build_food_items_tab(page: ft.Page, db, user_data: dict, is_desktop: bool):
 
         def on_file_pick(e: ft.FilePickerResultEvent):
             if e.files:
-                import shutil
                 src = e.files[0].path
-                upload_dir = "assets/uploads/foods"
-                os.makedirs(upload_dir, exist_ok=True)
-                filename = os.path.basename(src)
-                dest = os.path.join(upload_dir, filename)
                 
                 try:
-                    shutil.copy(src, dest)
+                    dest = store_upload(src, FOOD_UPLOAD_DIR)
+                    discard_upload(db, picked["path"])  # an earlier pick in this dialog
+                    picked["path"] = dest
                     uploaded_image_path["value"] = dest
+                    make_thumbnails_async(dest)
                     
                     image_preview.content = ft.Image(
                         src=dest,
@@ -180,6 +184,10 @@ def build_food_items_tab(page: ft.Page, db, user_data: dict, is_desktop: bool):
                     message.color = "red"
                     page.update()
 
+        def discard_pick():
+            discard_upload(db, picked["path"])
+            picked["path"] = None
+
         file_picker = ft.FilePicker(on_result=on_file_pick)
         page.overlay.append(file_picker)
         page.update()
@@ -201,6 +209,9 @@ def build_food_items_tab(page: ft.Page, db, user_data: dict, is_desktop: bool):
                 )
                 db.add(new_item)
                 db.commit()
+                invalidate_catalog()
+                keep_upload(picked["path"])
+                picked["path"] = None
                 
                 db.add(AuditLog(user_email=user_data.get("email"), action=f"Added food item: {new_item.name}"))
                 db.commit()
@@ -253,9 +264,10 @@ def build_food_items_tab(page: ft.Page, db, user_data: dict, is_desktop: bool):
                 alignment=ft.alignment.top_center 
             ),
             actions=[
-                ft.TextButton("Cancel", on_click=lambda e: close_dialog(page, dialog)),
+                ft.TextButton("Cancel", on_click=lambda e: (discard_pick(), close_dialog(page, dialog))),
                 ft.ElevatedButton("Save", on_click=save_food)
-            ]
+            ],
+            on_dismiss=lambda e: discard_pick()
         )
         page.overlay.append(dialog)
         dialog.open = True
@@ -276,8 +288,9 @@ def build_food_items_tab(page: ft.Page, db, user_data: dict, is_desktop: bool):
         message = ft.Text("", color="red")
         
         uploaded_image_path = {"value": item.image or ""}
+        picked = {"path": None}  # stored by this dialog, not saved yet
         
-        if item.image and os.path.exists(item.image):
+        if asset_exists(item.image):
             image_preview = ft.Container(
                 content=ft.Image(
                     src=item.image,
@@ -304,16 +317,14 @@ def build_food_items_tab(page: ft.Page, db, user_data: dict, is_desktop: bool):
 
         def on_file_pick(e: ft.FilePickerResultEvent):
             if e.files:
-                import shutil
                 src = e.files[0].path
-                upload_dir = "assets/uploads/foods"
-                os.makedirs(upload_dir, exist_ok=True)
-                filename = os.path.basename(src)
-                dest = os.path.join(upload_dir, filename)
                 
                 try:
-                    shutil.copy(src, dest)
+                    dest = store_upload(src, FOOD_UPLOAD_DIR)
+                    discard_upload(db, picked["path"])  # an earlier pick in this dialog
+                    picked["path"] = dest
                     uploaded_image_path["value"] = dest
+                    make_thumbnails_async(dest)
                     
                     image_preview.content = ft.Image(
                         src=dest,
@@ -330,6 +341,10 @@ def build_food_items_tab(page: ft.Page, db, user_data: dict, is_desktop: bool):
                     message.color = "red"
                     page.update()
 
+        def discard_pick():
+            discard_upload(db, picked["path"])
+            picked["path"] = None
+
         file_picker = ft.FilePicker(on_result=on_file_pick)
         page.overlay.append(file_picker)
         page.update()
@@ -342,12 +357,18 @@ def build_food_items_tab(page: ft.Page, db, user_data: dict, is_desktop: bool):
                 return
 
             try:
+                previous_image = item.image
                 item.name = name_field.value.strip()
                 item.description = description_field.value.strip()
                 item.price = float(price_field.value)
                 item.category = category_dropdown.value
                 item.image = uploaded_image_path["value"]
                 db.commit()
+                invalidate_catalog()
+                keep_upload(picked["path"])
+                picked["path"] = None
+                if previous_image != item.image:
+                    release_upload(db, previous_image)
                 
                 db.add(AuditLog(user_email=user_data.get("email"), action=f"Updated food item: {item.name}"))
                 db.commit()
@@ -403,9 +424,10 @@ def build_food_items_tab(page: ft.Page, db, user_data: dict, is_desktop: bool):
                 alignment=ft.alignment.top_center 
             ),
             actions=[
-                ft.TextButton("Cancel", on_click=lambda e: close_dialog(page, dialog)),
+                ft.TextButton("Cancel", on_click=lambda e: (discard_pick(), close_dialog(page, dialog))),
                 ft.ElevatedButton("Update", on_click=update_food)
-            ]
+            ],
+            on_dismiss=lambda e: discard_pick()
         )
         page.overlay.append(dialog)
         dialog.open = True
@@ -417,6 +439,8 @@ def build_food_items_tab(page: ft.Page, db, user_data: dict, is_desktop: bool):
         def confirm_delete(e):
             db.delete(item)
             db.commit()
+            invalidate_catalog()
+            release_upload(db, item.image)
             
             db.add(AuditLog(user_email=user_data.get("email"), action=f"Deleted food item: {item.name}"))
             db.commit()
@@ -1,15 +1,17 @@
 """
 Orders Management Tab for Admin Panel
 """
+import threading
+from datetime import datetime, timedelta
 import flet as ft
-from models.order import Order
-from models.user import User
-from models.audit_log import AuditLog
+from core.query_metrics import track_queries
+from core.admin_order_service import list_orders, update_order_status as set_order_status, ORDER_STATUSES
 from ui.admin_constants import (
     DESKTOP_COLUMNS,
     GRID_SPACING, GRID_RUN_SPACING
 )
 
+@track_queries
 def build_orders_tab(page: ft.Page, db, user_data: dict, is_desktop: bool):
     """
     Build the Orders management tab
@@ -28,36 +30,33 @@ def build_orders_tab(page: ft.Page, db, user_data: dict, is_desktop: bool):
     
     def build_order_card(order):
         """Build a single order card - SAME DESIGN for mobile & desktop"""
-        user = db.query(User).get(order.user_id)
-        username = user.full_name if user else "Unknown"
-        
         return ft.Card(
             content=ft.Container(
                 content=ft.Column([
                     ft.Row([
-                        ft.Text(f"Order #{order.id}", weight="bold", size=14, color='black'),
+                        ft.Text(f"Order #{order['id']}", weight="bold", size=14, color='black'),
                         ft.Container(
-                            content=ft.Text(order.status, color="white", size=12),
-                            bgcolor="green" if order.status == "Completed" else "orange" if order.status == "Pending" else "red",
+                            content=ft.Text(order["status"], color="white", size=12),
+                            bgcolor="green" if order["status"] == "Completed" else "orange" if order["status"] == "Pending" else "red",
                             padding=5,
                             border_radius=5
                         )
                     ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
-                    ft.Text(f"by {username}", size=12, color="grey700"),
+                    ft.Text(f"by {order['customer']} · {order['created_at'].strftime('%Y-%m-%d %H:%M')}", size=12, color="grey700"),
                     ft.Row([
-                        ft.Text(f"Total: ₱{order.total_price:.2f}", size=14, weight="bold", color="green"),
+                        ft.Text(f"Total: ₱{order['total_price']:.2f}", size=14, weight="bold", color="green"),
                         ft.Row([
                             ft.ElevatedButton(
                                 "Cancel",
                                 on_click=lambda e, o=order: update_order_status(o, "Cancelled"),
-                                disabled=order.status == "Cancelled",
+                                disabled=order["status"] == "Cancelled",
                                 style=ft.ButtonStyle(padding=8, color='blue700', bgcolor='grey200'),
                                 height=35
                             ),
                             ft.ElevatedButton(
                                 "Done",
                                 on_click=lambda e, o=order: update_order_status(o, "Completed"),
-                                disabled=order.status == "Completed",
+                                disabled=order["status"] == "Completed",
                                 style=ft.ButtonStyle(padding=8, color='green500', bgcolor='grey200'),
                                 height=35
                             ),
@@ -78,38 +77,118 @@ def build_orders_tab(page: ft.Page, db, user_data: dict, is_desktop: bool):
         child_aspect_ratio=3.8,  
         spacing=GRID_SPACING,
         run_spacing=GRID_RUN_SPACING,
-        expand=True
+        expand=True,
+        on_scroll_interval=100,
+        on_scroll=lambda e: on_scroll(e)
     )
 
-    orders_list = ft.Column(spacing=10, scroll=ft.ScrollMode.AUTO, expand=True)
+    orders_list = ft.ListView(
+        spacing=10,
+        expand=True,
+        on_scroll_interval=100,
+        on_scroll=lambda e: on_scroll(e)
+    )
+    orders_view = orders_grid if is_desktop else orders_list
+
+    # One page at a time; cards maps order id -> its card so a status change patches only that card
+    board_state = {"filters": {}, "next": None, "loading": False}
+    board_lock = threading.Lock()
+    cards = {}
+
+    # ===================== FILTERS =====================
+
+    status_filter = ft.Dropdown(
+        label="Status",
+        value="All",
+        width=150,
+        options=[ft.dropdown.Option("All")] + [ft.dropdown.Option(s) for s in ORDER_STATUSES],
+        on_change=lambda e: apply_filters()
+    )
+    date_from_field = ft.TextField(label="From", hint_text="YYYY-MM-DD", width=140, on_submit=lambda e: apply_filters())
+    date_to_field = ft.TextField(label="To", hint_text="YYYY-MM-DD", width=140, on_submit=lambda e: apply_filters())
+    customer_field = ft.TextField(label="Customer", hint_text="Name or email", width=200, on_submit=lambda e: apply_filters())
+
+    def parse_date(field):
+        value = (field.value or "").strip()
+        return datetime.strptime(value, "%Y-%m-%d") if value else None
+
+    def apply_filters():
+        try:
+            date_from = parse_date(date_from_field)
+            date_to = parse_date(date_to_field)
+        except ValueError:
+            page.snack_bar = ft.SnackBar(ft.Text("Dates must be YYYY-MM-DD"), bgcolor=ft.Colors.RED, open=True)
+            page.update()
+            return
+        board_state["filters"] = {
+            "status": None if status_filter.value == "All" else status_filter.value,
+            "date_from": date_from,
+            "date_to": date_to + timedelta(days=1) if date_to else None,  # "To" day is inclusive
+            "customer": (customer_field.value or "").strip() or None,
+        }
+        load_orders()
+
+    def clear_filters(e):
+        status_filter.value = "All"
+        date_from_field.value = date_to_field.value = customer_field.value = ""
+        apply_filters()
     
     # ===================== LOAD DATA =====================
     
+    load_more = ft.TextButton("Load more orders", on_click=lambda e: load_next_page(), visible=False)
+
+    def append_page(result):
+        for order in result["orders"]:
+            card = build_order_card(order)
+            cards[order["id"]] = card
+            orders_view.controls.append(card)
+        board_state["next"] = result["next"]
+        load_more.visible = result["next"] is not None
+
     def load_orders():
-        """Load orders into grid/list"""
-        if is_desktop:
-            orders_grid.controls.clear()
-            orders = db.query(Order).order_by(Order.created_at.desc()).all()
-            for order in orders:
-                orders_grid.controls.append(build_order_card(order))
-        else:
-            orders_list.controls.clear()
-            orders = db.query(Order).order_by(Order.created_at.desc()).all()
-            for order in orders:
-                orders_list.controls.append(build_order_card(order))
+        """Load the first page for the current filters into grid/list"""
+        orders_view.controls.clear()
+        cards.clear()
+        append_page(list_orders(db, **board_state["filters"]))
+        if not cards:
+            orders_view.controls.append(ft.Text("No orders match these filters", size=14, color="grey", italic=True))
+        if orders_view.page:
+            orders_view.scroll_to(offset=0)
+        page.update()
+
+    def load_next_page():
+        with board_lock:
+            if board_state["loading"] or board_state["next"] is None:
+                return
+            board_state["loading"] = True
+        try:
+            append_page(list_orders(db, after=board_state["next"], **board_state["filters"]))
+        finally:
+            board_state["loading"] = False
         page.update()
+
+    def on_scroll(e):
+        if e.pixels >= e.max_scroll_extent - 300:
+            load_next_page()
     
     # ===================== UPDATE ORDER STATUS =====================
     
     def update_order_status(order, status):
-        order.status = status
-        db.commit()
-        
-        db.add(AuditLog(user_email=user_data.get("email"), action=f"Updated order #{order.id} to {status}"))
-        db.commit()
-        
-        load_orders()
-        page.snack_bar = ft.SnackBar(ft.Text(f"Order #{order.id} → {status}"), bgcolor=ft.Colors.GREEN, open=True)
+        updated = set_order_status(db, order["id"], status, admin_email=user_data.get("email"))
+        card = cards.pop(order["id"], None)
+        if card in orders_view.controls:
+            index = orders_view.controls.index(card)
+            wanted = board_state["filters"].get("status")
+            if updated is None or (wanted and updated["status"] != wanted):
+                orders_view.controls.pop(index)  # no longer matches the status filter
+            else:
+                cards[updated["id"]] = orders_view.controls[index] = build_order_card(updated)
+        if updated is None:
+            page.snack_bar = ft.SnackBar(ft.Text(f"Order #{order['id']} no longer exists"), bgcolor=ft.Colors.ORANGE, open=True)
+        elif updated["status"] != status:
+            page.snack_bar = ft.SnackBar(ft.Text(f"Order #{order['id']} was already {updated['status']}"), bgcolor=ft.Colors.ORANGE, open=True)
+        else:
+            page.snack_bar = ft.SnackBar(ft.Text(f"Order #{order['id']} → {status}"), bgcolor=ft.Colors.GREEN, open=True)
         page.update()
     
     # ===================== BUILD TAB =====================
@@ -126,11 +205,23 @@ def build_orders_tab(page: ft.Page, db, user_data: dict, is_desktop: bool):
                 content=ft.Text("Manage Orders", size=20, weight="bold", color='black'),
                 padding=10
             ),
+            ft.Container(
+                content=ft.Row([
+                    status_filter,
+                    date_from_field,
+                    date_to_field,
+                    customer_field,
+                    ft.IconButton(icon=ft.Icons.SEARCH, tooltip="Apply filters", on_click=lambda e: apply_filters()),
+                    ft.TextButton("Clear", on_click=clear_filters),
+                ], wrap=True, spacing=8),
+                padding=ft.padding.symmetric(horizontal=10)
+            ),
             
             ft.Container(
-                content=orders_grid if is_desktop else orders_list,
+                content=orders_view,
                 expand=True,
                 padding=10
-            )
+            ),
+            ft.Container(content=load_more, alignment=ft.alignment.center)
         ], expand=True, spacing=0)
     )
\ No newline at end of file
@@ -2,6 +2,7 @@
 Users Management Tab for Admin Panel
 """
 import flet as ft
+from core.query_metrics import track_queries
 from models.user import User
 from models.audit_log import AuditLog
 from core.admin_user_service import create_user_by_admin, update_user_by_admin, delete_user_by_admin
@@ -10,6 +11,7 @@ from ui.admin_constants import USER_CARD_MIN_HEIGHT, DESKTOP_COLUMNS, GRID_SPACI
 from ui.admin_utils import is_valid_email, close_dialog
 import threading
 
+@track_queries
 def build_users_tab(page: ft.Page, db, user_data: dict, is_desktop: bool):
     """
     Build the Users management tab
@@ -3,17 +3,19 @@ Admin Panel - Main Orchestrator
 Imports and coordinates all admin tabs
 """
 import flet as ft
-from core.db import SessionLocal
+from core.query_metrics import track_queries
+from core.session_registry import page_session
 from ui.admin_constants import BREAKPOINT
 from ui.admin_food_items import build_food_items_tab
 from ui.admin_orders import build_orders_tab
 from ui.admin_users import build_users_tab
 
+@track_queries
 def admin_view(page: ft.Page):
     """
     Main admin panel view - orchestrates all tabs
     """
-    db = SessionLocal()
+    db = page_session(page)
     page.title = "Admin Panel"
 
     # Check if user is admin
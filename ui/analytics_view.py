@@ -3,6 +3,7 @@ from flet.plotly_chart import PlotlyChart
 import plotly.graph_objects as go
 import plotly.express as px
 from core.db import SessionLocal
+from core.query_metrics import track_queries
 from core.analytics_service import (
     get_sales_trends,
     get_best_selling_items,
@@ -15,6 +16,7 @@ from core.analytics_service import (
 import threading
 import time
 
+@track_queries
 def analytics_view(page: ft.Page):
     page.title = "Analytics Dashboard - Pojangmacha"
     
@@ -1,38 +1,93 @@
 import flet as ft
-import os
-from models.food_item import FoodItem
-from models.cart import Cart
+from core.query_metrics import track_queries
+from core.image_service import thumbnail_for, THUMB_CART
+from core.asset_manifest import asset_exists
 
+@track_queries
 def cart_view(
     db,
     user_id,
-    get_user_cart,
+    get_cart_summary,
     remove_from_cart,
     update_cart_quantity,
     update_cart_badge,
     switch_tab,
     show_checkout_page,
-    refresh_cart
+    refresh_cart,
+    queue_cart_change=None,
+    summary=None
 ):
-    cart_items = get_user_cart(db, user_id)
+    # One cart query priced from the menu catalog; re-rendering also refreshes the badge count.
+    # `summary` is a cart already read (and priced) by the caller
+    cart_items = (summary or get_cart_summary(db, user_id))["items"]
     cart_column = ft.Column(spacing=10, scroll=ft.ScrollMode.AUTO)
-    total = 0
+    line_refs = {}  # cart_id -> controls patched in place by optimistic updates
 
-    def update_quantity(cart_item_id, change):
-        cart_item = db.query(Cart).filter(Cart.id == cart_item_id).first()
-        if cart_item:
-            new_quantity = cart_item.quantity + change
-            if new_quantity <= 0:
-                remove_from_cart(db, cart_item_id)
-            else:
-                update_cart_quantity(db, cart_item_id, new_quantity)
-        update_cart_badge()
-        refresh_cart()
+    def update_quantity(item, change):
+        if queue_cart_change is None:
+            # The rendered quantity is current, so this is a single write (0 removes the row)
+            update_cart_quantity(db, item["cart_id"], item["quantity"] + change)
+            refresh_cart()
+            update_cart_badge()
+            return
 
-    def remove_item(cart_item_id):
-        remove_from_cart(db, cart_item_id)
+        # Write-behind: queue the change and patch this line only
+        queue_cart_change(user_id, item["food_id"], change)
+        item["quantity"] += change
+        item["subtotal"] = item["unit_price"] * item["quantity"]
+        refs = line_refs[item["cart_id"]]
+        if item["quantity"] <= 0:
+            cart_items.remove(item)
+            cart_column.controls.remove(refs["line"])
+            if not cart_items:
+                refresh_cart()  # empty state
+        else:
+            refs["subtotal"].value = f"Subtotal: ₱{item['subtotal']:.2f}"
+            refs["buttons"].content = quantity_buttons(item)
         update_cart_badge()
+
+    def remove_item(item):
+        if queue_cart_change is not None:
+            update_quantity(item, -item["quantity"])
+            return
+        remove_from_cart(db, item["cart_id"])
         refresh_cart()
+        update_cart_badge()
+
+    def quantity_buttons(cart_item):
+        quantity = cart_item["quantity"]
+        if quantity == 1:
+            return ft.Row([
+                ft.IconButton(
+                    icon=ft.Icons.DELETE,
+                    icon_color="red",
+                    icon_size=18,
+                    tooltip="Remove",
+                    on_click=lambda e, item=cart_item: remove_item(item)
+                ),
+                ft.Text(str(quantity), size=14, weight="bold", color='black'),
+                ft.IconButton(
+                    icon=ft.Icons.ADD,
+                    icon_size=16,
+                    on_click=lambda e, item=cart_item: update_quantity(item, 1),
+                    tooltip="Increase"
+                ),
+            ], spacing=2, alignment=ft.MainAxisAlignment.CENTER)
+        return ft.Row([
+            ft.IconButton(
+                icon=ft.Icons.REMOVE,
+                icon_size=16,
+                on_click=lambda e, item=cart_item: update_quantity(item, -1),
+                tooltip="Decrease"
+            ),
+            ft.Text(str(quantity), size=14, weight="bold", color='black'),
+            ft.IconButton(
+                icon=ft.Icons.ADD,
+                icon_size=16,
+                on_click=lambda e, item=cart_item: update_quantity(item, 1),
+                tooltip="Increase"
+            ),
+        ], spacing=2, alignment=ft.MainAxisAlignment.CENTER)
 
     if not cart_items:
         cart_column.controls.append(
@@ -61,85 +116,46 @@ def cart_view(
         )
     else:
         for cart_item in cart_items:
-            food = db.query(FoodItem).filter(FoodItem.id == cart_item.food_id).first()
-            if not food:
-                remove_from_cart(db, cart_item.id)
-                continue
-            quantity = cart_item.quantity
-            subtotal = food.price * quantity
-            total += subtotal
-
-            # --- BUTTONS LOGIC ---
-            if quantity == 1:
-                button_row = ft.Row([
-                    ft.IconButton(
-                        icon=ft.Icons.DELETE,
-                        icon_color="red",
-                        icon_size=18,
-                        tooltip="Remove",
-                        on_click=lambda e, cid=cart_item.id: remove_item(cid)
-                    ),
-                    ft.Text(str(quantity), size=14, weight="bold", color='black'),
-                    ft.IconButton(
-                        icon=ft.Icons.ADD,
-                        icon_size=16,
-                        on_click=lambda e, cid=cart_item.id: update_quantity(cid, 1),
-                        tooltip="Increase"
-                    ),
-                ], spacing=2, alignment=ft.MainAxisAlignment.CENTER)
-            else:
-                button_row = ft.Row([
-                    ft.IconButton(
-                        icon=ft.Icons.REMOVE,
-                        icon_size=16,
-                        on_click=lambda e, cid=cart_item.id: update_quantity(cid, -1),
-                        tooltip="Decrease"
-                    ),
-                    ft.Text(str(quantity), size=14, weight="bold", color='black'),
-                    ft.IconButton(
-                        icon=ft.Icons.ADD,
-                        icon_size=16,
-                        on_click=lambda e, cid=cart_item.id: update_quantity(cid, 1),
-                        tooltip="Increase"
-                    ),
-                ], spacing=2, alignment=ft.MainAxisAlignment.CENTER)
-
-            cart_column.controls.append(
-                ft.Container(
-                    content=ft.Card(
-                        content=ft.Container(
-                            padding=10,
-                            content=ft.Row([
-                                ft.Container(
-                                    content=ft.Image(
-                                        src=food.image,
-                                        width=60,
-                                        height=60,
-                                        fit=ft.ImageFit.COVER,
-                                        border_radius=8
-                                    ) if food.image and os.path.exists(food.image) else ft.Container(
-                                        width=60,
-                                        height=60,
-                                        bgcolor="grey300",
-                                        border_radius=8
-                                    ),
-                                    border=ft.border.all(1, "grey300"),
+            image = cart_item["image"]
+            refs = line_refs[cart_item["cart_id"]] = {
+                "subtotal": ft.Text(f"Subtotal: ₱{cart_item['subtotal']:.2f}", size=12, weight="bold", color="green"),
+                "buttons": ft.Container(content=quantity_buttons(cart_item)),
+            }
+            refs["line"] = ft.Container(
+                content=ft.Card(
+                    content=ft.Container(
+                        padding=10,
+                        content=ft.Row([
+                            ft.Container(
+                                content=ft.Image(
+                                    src=thumbnail_for(image, THUMB_CART),
+                                    width=60,
+                                    height=60,
+                                    fit=ft.ImageFit.COVER,
+                                    border_radius=8
+                                ) if asset_exists(image) else ft.Container(
+                                    width=60,
+                                    height=60,
+                                    bgcolor="grey300",
                                     border_radius=8
                                 ),
-                                ft.Column([
-                                    ft.Text(food.name, weight="bold", size=14, color="black"),
-                                    ft.Text(f"₱{food.price:.2f} each", size=11, color="grey700"),
-                                    ft.Text(f"Subtotal: ₱{subtotal:.2f}", size=12, weight="bold", color="green"),
-                                ], spacing=2, expand=True),
-                                button_row
-                            ], spacing=8, alignment=ft.MainAxisAlignment.CENTER),
-                            bgcolor="white",
-                            border_radius=12
-                        )
-                    ),
-                    padding=ft.padding.symmetric(horizontal=10)
-                )
+                                border=ft.border.all(1, "grey300"),
+                                border_radius=8
+                            ),
+                            ft.Column([
+                                ft.Text(cart_item["name"], weight="bold", size=14, color="black"),
+                                ft.Text(f"₱{cart_item['unit_price']:.2f} each", size=11, color="grey700"),
+                                refs["subtotal"],
+                            ], spacing=2, expand=True),
+                            refs["buttons"]
+                        ], spacing=8, alignment=ft.MainAxisAlignment.CENTER),
+                        bgcolor="white",
+                        border_radius=12
+                    )
+                ),
+                padding=ft.padding.symmetric(horizontal=10)
             )
+            cart_column.controls.append(refs["line"])
 
         # Add "Add more items" button only once, after all cart items
         cart_column.controls.append(
@@ -1,7 +1,20 @@
-import os
+import threading
 import flet as ft
-from models.food_item import FoodItem
+from core.query_metrics import track_queries
+from core.session_registry import thread_session
+from core.debounce import Debouncer
+from core.catalog_cache import get_menu_items
+from core.menu_search import search_menu, SEARCH_DEBOUNCE_MS
+from core.image_service import thumbnail_for, THUMB_MENU
+from core.asset_manifest import asset_exists
 
+# The menu is a ListView with a fixed row height: Flutter only lays out the rows in
+# view, and Python builds cards MENU_BATCH_SIZE at a time as the user scrolls.
+MENU_ITEM_EXTENT = 108      # card (80px image + padding) plus the list spacing
+MENU_BATCH_SIZE = 20
+MENU_PRELOAD_ROWS = 5       # append the next batch this many rows before the end
+
+@track_queries
 def food_view(
     db,
     user_id,
@@ -9,7 +22,15 @@ def food_view(
     add_to_cart,
     page,
 ):
-    items_column = ft.Column(spacing=3)
+    items_list = ft.ListView(
+        item_extent=MENU_ITEM_EXTENT,
+        spacing=0,
+        expand=True,
+        on_scroll_interval=50,
+        on_scroll=lambda e: on_scroll(e)
+    )
+    # items = what the list shows; shown = how many have cards
+    list_state = {"items": [], "shown": 0}
 
     def add_to_cart_directly(item):
         add_to_cart(db, user_id, item.id, quantity=1)
@@ -50,137 +71,126 @@ def food_view(
         )
 
     def show_skeleton_loader(container):
+        list_state.update(items=[], shown=0)
         container.controls.clear()
         for _ in range(5):
             container.controls.append(create_skeleton_card())
         page.update()
 
-    def load_items(category="All"):
-        show_skeleton_loader(items_column)
-        import time
-        time.sleep(0.1)
-        items_column.controls.clear()
-        query = db.query(FoodItem)
-        if category != "All":
-            query = query.filter(FoodItem.category == category)
-        items = query.all()
-        for item in items:
-            item_card = ft.Card(
-                content=ft.Container(
-                    padding=10,
-                    content=ft.Row([
-                        ft.Container(
-                            content=ft.Image(
-                                src=item.image,
-                                width=80,
-                                height=80,
-                                fit=ft.ImageFit.COVER,
-                                border_radius=8
-                            ) if item.image and os.path.exists(item.image) else ft.Container(
-                                width=80,
-                                height=80,
-                                bgcolor="grey300",
-                                border_radius=8
-                            ),
-                            border=ft.border.all(1, "grey300"),
-                            border_radius=8
-                        ),
-                        ft.Column([
-                            ft.Text(item.name, weight="bold", size=14, color="black"),
-                            ft.Text(item.description[:30] + "..." if len(item.description) > 30 else item.description, size=10, color="grey700"),
-                            ft.Text(f"₱{item.price:.2f}", color="green", size=14, weight="bold"),
-                        ], spacing=3, expand=True),
-                        ft.IconButton(
-                            icon=ft.Icons.ADD_CIRCLE,
-                            icon_color="#FEB23F",
-                            icon_size=28,
-                            tooltip="Add to cart",
-                            on_click=lambda e, it=item: add_to_cart_directly(it)
-                        )
-                    ], spacing=8, alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
-                    bgcolor='white',
-                    border_radius=12
-                )
+    def build_item_card(item):
+        # Grey placeholder; the picture (if the manifest has it) draws over it once decoded
+        image_slot = ft.Container(width=80, height=80, bgcolor="grey300", border_radius=8)
+        if asset_exists(item.image):
+            image_slot.content = ft.Image(
+                src=thumbnail_for(item.image, THUMB_MENU),
+                width=80,
+                height=80,
+                fit=ft.ImageFit.COVER,
+                border_radius=8
             )
-            items_column.controls.append(
-                ft.Container(
-                    content=item_card,
-                    padding=ft.padding.symmetric(horizontal=10)
-                )
+        item_card = ft.Card(
+            content=ft.Container(
+                padding=10,
+                content=ft.Row([
+                    ft.Container(
+                        content=image_slot,
+                        border=ft.border.all(1, "grey300"),
+                        border_radius=8
+                    ),
+                    ft.Column([
+                        ft.Text(item.name, weight="bold", size=14, color="black"),
+                        ft.Text(item.description[:30] + "..." if len(item.description) > 30 else item.description, size=10, color="grey700"),
+                        ft.Text(f"₱{item.price:.2f}", color="green", size=14, weight="bold"),
+                    ], spacing=3, expand=True),
+                    ft.IconButton(
+                        icon=ft.Icons.ADD_CIRCLE,
+                        icon_color="#FEB23F",
+                        icon_size=28,
+                        tooltip="Add to cart",
+                        on_click=lambda e, it=item: add_to_cart_directly(it)
+                    )
+                ], spacing=8, alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+                bgcolor='white',
+                border_radius=12
             )
-        if not items_column.controls:
-            items_column.controls.append(
+        )
+        return ft.Container(
+            content=item_card,
+            padding=ft.padding.symmetric(horizontal=10)
+        )
+
+    def append_batch():
+        start = list_state["shown"]
+        batch = list_state["items"][start:start + MENU_BATCH_SIZE]
+        items_list.controls.extend(build_item_card(item) for item in batch)
+        list_state["shown"] += len(batch)
+
+    def show_items(items, empty_text, italic=False):
+        list_state.update(items=items, shown=0)
+        items_list.controls.clear()
+        if items:
+            append_batch()
+        else:
+            items_list.controls.append(
                 ft.Container(
-                    content=ft.Text("No items in this category yet.", size=14, color="grey", italic=True),
+                    content=ft.Text(empty_text, size=14, color="grey", italic=italic),
                     padding=20,
                     alignment=ft.alignment.center
                 )
             )
+        if items_list.page:
+            items_list.scroll_to(offset=0)
         page.update()
 
+    def on_scroll(e):
+        if e.pixels < e.max_scroll_extent - MENU_PRELOAD_ROWS * MENU_ITEM_EXTENT:
+            return
+        with list_lock:
+            if list_state["shown"] >= len(list_state["items"]):
+                return
+            append_batch()
+        page.update()
+
+    # Search runs on a debounce timer thread with its own session. Every keystroke
+    # bumps "seq"; a search whose seq is no longer current drops its results.
+    search_state = {"seq": 0, "keyword": "", "category": "All", "loading": False}
+    list_lock = threading.Lock()  # guards search_state and the list's controls
+
+    def load_items(category="All"):
+        search_debouncer.cancel()
+        with list_lock:
+            search_state["seq"] += 1  # a search already running is stale now
+            search_state["keyword"] = ""
+            search_state["category"] = category
+            search_state["loading"] = False
+            show_items(get_menu_items(category), "No items in this category yet.", italic=True)  # in-memory catalog
+
+    def run_search(_key, seq, keyword):
+        with list_lock:
+            if seq != search_state["seq"]:
+                return  # superseded before it started
+        with thread_session() as thread_db:
+            results = search_menu(thread_db, keyword)  # FTS5, ranked, prefix matching
+        with list_lock:
+            if seq != search_state["seq"]:
+                return  # newer input arrived while this one ran
+            search_state["loading"] = False
+            show_items(results, "No items found")
+
+    search_debouncer = Debouncer(run_search, SEARCH_DEBOUNCE_MS / 1000)
+
     def search_items(keyword):
-        show_skeleton_loader(items_column)
-        import time
-        time.sleep(0.1)
-        items_column.controls.clear()
         if not keyword.strip():
-            load_items()
+            load_items(search_state["category"])
             return
-        results = db.query(FoodItem).filter(FoodItem.name.ilike(f"%{keyword}%")).all()
-        if not results:
-            items_column.controls.append(
-                ft.Container(
-                    content=ft.Text("No items found", size=14, color="grey"),
-                    padding=20,
-                    alignment=ft.alignment.center
-                )
-            )
-        else:
-            for item in results:
-                item_card = ft.Card(
-                    content=ft.Container(
-                        padding=10,
-                        content=ft.Row([
-                            ft.Container(
-                                content=ft.Image(
-                                    src=item.image,
-                                    width=80,
-                                    height=80,
-                                    fit=ft.ImageFit.COVER,
-                                    border_radius=8
-                                ) if item.image and os.path.exists(item.image) else ft.Container(
-                                    width=80,
-                                    height=80,
-                                    bgcolor="grey300",
-                                    border_radius=8
-                                ),
-                                border=ft.border.all(1, "grey300"),
-                                border_radius=8
-                            ),
-                            ft.Column([
-                                ft.Text(item.name, weight="bold", size=14, color="black"),
-                                ft.Text(item.description[:30] + "..." if len(item.description) > 30 else item.description, size=10, color="grey700"),
-                                ft.Text(f"₱{item.price:.2f}", color="green", size=14, weight="bold"),
-                            ], spacing=3, expand=True),
-                            ft.IconButton(
-                                icon=ft.Icons.ADD_CIRCLE,
-                                icon_color="#FEB23F",
-                                icon_size=28,
-                                tooltip="Add to cart",
-                                on_click=lambda e, it=item: add_to_cart_directly(it)
-                            )
-                        ], spacing=8, alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
-                        bgcolor='white',
-                        border_radius=12
-                    )
-                )
-                items_column.controls.append(
-                    ft.Container(
-                        content=item_card,
-                        padding=ft.padding.symmetric(horizontal=10)
-                    )
-                )
-        page.update()
+        with list_lock:
+            search_state["seq"] += 1
+            seq = search_state["seq"]
+            search_state["keyword"] = keyword
+            if not search_state["loading"]:
+                show_skeleton_loader(items_list)
+            search_state["loading"] = True
+        search_debouncer.trigger(None, seq, keyword)
 
     categories = ["All", "Noodles", "K-Food", "Korean Bowls", "Combo", "Toppings", "Drinks"]
     category_row = ft.Row(
@@ -234,7 +244,7 @@ def food_view(
                     padding=10,
                     height=60
                 ),
-                ft.Column([items_column], scroll=ft.ScrollMode.AUTO, expand=True),
+                items_list,
             ], spacing=0, expand=True),
             expand=True,
             padding=ft.padding.only(bottom=10),
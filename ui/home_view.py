@@ -1,14 +1,17 @@
 import os
+import uuid
+import threading
 import flet as ft
-from core.db import SessionLocal
-from models.food_item import FoodItem
+from core.query_metrics import track_queries
+from core.session_registry import page_session
 from models.user import User
-from models.order import Order, OrderItem
 from models.cart import Cart
 from models.audit_log import AuditLog
-from core.cart_service import get_user_cart, add_to_cart, update_cart_quantity, remove_from_cart, get_cart_count
+from core.cart_service import get_cart_summary, add_to_cart, update_cart_quantity, remove_from_cart, get_cart_badge_count
 from core.profile_service import get_user_by_id
-from datetime import datetime
+from core.checkout_service import place_order
+from core.cart_buffer import CART_WRITE_BEHIND, queue_cart_change, flush_cart, pending_cart_changes, watch_cart
+from core.session_registry import thread_session
 import time
 from ui.checkout_view import checkout_view
 from ui.profile_view import profile_view_widget
@@ -16,8 +19,9 @@ from ui.order_history_view import order_history_widget
 from ui.cart_view import cart_view
 from ui.food_view import food_view  # <-- Import your new food view
 
+@track_queries
 def home_view(page: ft.Page):
-    db = SessionLocal()
+    db = page_session(page)
     page.title = "Pojangmacha"
 
     # Get logged-in user
@@ -33,6 +37,8 @@ def home_view(page: ft.Page):
     # State
     nav_state = {"tab": "food"}  # "food", "cart", "orders", "profile"
     show_checkout = {"value": False}
+    cart_state = {"items": None}  # cart lines on screen (patched by optimistic updates), None off the cart tab
+    checkout_lock = threading.Lock()  # taps are handled on worker threads; they share `db`
     cart_count_text = ft.Text("", color="white", size=10, weight="bold")
     cart_badge_container = ft.Container(
         content=cart_count_text,
@@ -47,7 +53,7 @@ def home_view(page: ft.Page):
 
     # --- CART BADGE ---
     def update_cart_badge():
-        total_items = get_cart_count(db, user_id)
+        total_items = get_cart_badge_count(db, user_id)  # in-memory after the first call
         if total_items > 0:
             cart_count_text.value = str(total_items)
             cart_badge_container.visible = True
@@ -106,43 +112,78 @@ def home_view(page: ft.Page):
     )
 
     def handle_checkout(e=None):
-        cart_items = show_checkout.get("cart_items", [])
-        total = show_checkout.get("total", 0)
-        if not cart_items:
+        # Order, items, cart cleanup and rollups commit together. A repeated tap (or a
+        # retry after an error) reuses this checkout's token and gets the same order back.
+        with checkout_lock:
+            flush_cart(user_id)  # queued +/- taps first
+            try:
+                new_order = place_order(db, user_id, checkout_token=show_checkout.get("token"))
+            except Exception as ex:
+                print(f"Checkout error: {ex}")
+                page.snack_bar = ft.SnackBar(ft.Text("Checkout failed, please try again."), open=True)
+                page.update()
+                return
+        update_cart_badge()
+        if not new_order:
             page.snack_bar = ft.SnackBar(ft.Text("No items to checkout."), open=True)
             page.update()
             return
 
-        # Create new order
-        new_order = Order(user_id=user_id, total_price=total, status="Pending", created_at=datetime.now())
-        db.add(new_order)
-        db.commit()
-        db.refresh(new_order)
-
-        # Add order items
-        for item in cart_items:
-            food = db.query(FoodItem).filter(FoodItem.name == item["name"]).first()
-            if food:
-                db.add(OrderItem(order_id=new_order.id, food_id=food.id, quantity=item["quantity"], subtotal=item["subtotal"]))
-        db.commit()
-
-        # Clear cart
-        for cart_item in get_user_cart(db, user_id):
-            remove_from_cart(db, cart_item.id)
-        update_cart_badge()
-
         # Show confirmation and go to orders tab
+        shown_total = show_checkout.get("total", 0)
         show_checkout["value"] = False
         nav_state["tab"] = "orders"
         render_main_content()
-        page.snack_bar = ft.SnackBar(ft.Text("Order placed!"), open=True)
+        if abs(new_order.total_price - shown_total) >= 0.005:
+            # The summary was priced from the in-process catalog, which another process may have outdated
+            message = f"Order placed! The total changed since you reviewed it: ₱{new_order.total_price:.2f} (was ₱{shown_total:.2f})."
+        else:
+            message = "Order placed!"
+        page.snack_bar = ft.SnackBar(ft.Text(message), open=True)
         page.update()
 
     def refresh_cart():
         render_main_content()
 
+    def on_cart_flushed(_user_id):
+        # Flush thread: queued +/- taps were written, dropped or merged with another
+        # session's changes; redraw the cart if the database disagrees with the screen
+        if cart_state["items"] is None or pending_cart_changes(user_id):
+            return  # not on the cart tab, or another flush follows
+        with thread_session() as thread_db:
+            summary = get_cart_summary(thread_db, user_id)
+        shown = {item["cart_id"]: item["quantity"] for item in cart_state["items"]}
+        if cart_state["items"] is None or shown == {item["cart_id"]: item["quantity"] for item in summary["items"]}:
+            return
+        render_cart(summary)
+        update_cart_badge()
+
+    if CART_WRITE_BEHIND:
+        watch_cart(user_id, on_cart_flushed)
+
+    def render_cart(summary=None):
+        if summary is None:
+            flush_cart(user_id)  # the view reads the cart from the database
+            summary = get_cart_summary(db, user_id)
+        cart_state["items"] = summary["items"]
+        content_container.content = cart_view(
+            db=db,
+            user_id=user_id,
+            get_cart_summary=get_cart_summary,
+            remove_from_cart=remove_from_cart,
+            update_cart_quantity=update_cart_quantity,
+            update_cart_badge=update_cart_badge,
+            switch_tab=switch_tab,
+            show_checkout_page=show_checkout_page,
+            refresh_cart=refresh_cart,
+            queue_cart_change=queue_cart_change if CART_WRITE_BEHIND else None,
+            summary=summary
+        )
+        page.update()
+
     # --- MAIN CONTENT RENDERERS ---
     def render_main_content():
+        cart_state["items"] = None
         if show_checkout["value"]:
             content_container.content = checkout_view(
                 page,
@@ -157,18 +198,7 @@ def home_view(page: ft.Page):
         if tab == "food":
             render_food()
         elif tab == "cart":
-            content_container.content = cart_view(
-                db=db,
-                user_id=user_id,
-                get_user_cart=get_user_cart,
-                remove_from_cart=remove_from_cart,
-                update_cart_quantity=update_cart_quantity,
-                update_cart_badge=update_cart_badge,
-                switch_tab=switch_tab,
-                show_checkout_page=show_checkout_page,
-                refresh_cart=refresh_cart
-            )
-            page.update()
+            render_cart()
         elif tab == "orders":
             render_orders()
         elif tab == "profile":
@@ -196,24 +226,14 @@ def home_view(page: ft.Page):
         page.update()
 
     def show_checkout_page():
-        # Build cart_items and total for checkout
-        cart_items_list = []
-        total = 0
-        for cart_item in get_user_cart(db, user_id):
-            food = db.query(FoodItem).filter(FoodItem.id == cart_item.food_id).first()
-            if not food:
-                continue
-            quantity = cart_item.quantity
-            subtotal = food.price * quantity
-            total += subtotal
-            cart_items_list.append({
-                "quantity": quantity,
-                "name": food.name,
-                "subtotal": subtotal
-            })
+        # Same priced view model as the cart tab (cart query + catalog prices); place_order
+        # prices from the database, so handle_checkout reports a total that changed since
+        flush_cart(user_id)
+        summary = get_cart_summary(db, user_id)
         show_checkout["value"] = True
-        show_checkout["cart_items"] = cart_items_list
-        show_checkout["total"] = total
+        show_checkout["token"] = uuid.uuid4().hex  # idempotency key for this checkout attempt
+        show_checkout["cart_items"] = summary["items"]
+        show_checkout["total"] = summary["total"]
         render_main_content()
 
     # --- INITIAL RENDER ---
@@ -4,7 +4,7 @@ import threading
 import time
 from datetime import datetime
 
-from core.db import SessionLocal
+from core.session_registry import page_session, thread_session
 from core.session_manager import start_session
 from core.auth_service import authenticate_user, create_user_from_google, hash_password
 from core.google_auth import get_google_user_info
@@ -76,7 +76,8 @@ def show_lockout_dialog(page, locked_until, message):
                 status_message.value = "You can try logging in again."
                 status_message.color = "green"
                 cancel_button.disabled = False
-                clear_global_lockout(db)
+                with thread_session() as thread_db:
+                    clear_global_lockout(thread_db)
                 page.update()
                 break
 
@@ -84,8 +85,7 @@ def show_lockout_dialog(page, locked_until, message):
 
 def login_view(page: ft.Page):
     page.title = "Login - Pojangmacha"
-    global db
-    db = SessionLocal()
+    db = page_session(page)
     MOBILE_WIDTH = 350
 
     # ===== INPUT FIELDS (NEW DESIGN) =====
@@ -218,13 +218,14 @@ def login_view(page: ft.Page):
                     google_btn.disabled = False
                     page.update()
                     return
-                user = create_user_from_google(
-                    db,
-                    email=user_info['email'],
-                    full_name=user_info.get('name', 'Google User'),
-                    picture=user_info.get('picture')
-                )
-                record_login_attempt(db, user.email, True)
+                with thread_session() as thread_db:
+                    user = create_user_from_google(
+                        thread_db,
+                        email=user_info['email'],
+                        full_name=user_info.get('name', 'Google User'),
+                        picture=user_info.get('picture')
+                    )
+                    record_login_attempt(thread_db, user.email, True)
                 complete_login(user)
             except Exception as ex:
                 print(f"Google OAuth error: {ex}")
@@ -1,12 +1,16 @@
-import os
+import threading
 import flet as ft
-from core.db import SessionLocal
-from models.order import Order, OrderItem
-from models.food_item import FoodItem
+from core.query_metrics import track_queries
+from core.session_registry import page_session
+from core.order_service import get_order_page
+from core.catalog_cache import get_catalog_item
+from core.image_service import thumbnail_for, THUMB_HISTORY
+from core.asset_manifest import asset_exists
 from models.audit_log import AuditLog
 
+@track_queries
 def order_history_widget(page, on_nav, update_cart_badge):
-    db = SessionLocal()
+    db = page_session(page, "orders")
     user_data = page.session.get("user")
     if not user_data:
         return ft.Text("Please log in first.", color="red")
@@ -14,25 +18,25 @@ def order_history_widget(page, on_nav, update_cart_badge):
     user_id = user_data.get("id")
     user_email = user_data.get("email")
 
-    orders = (
-        db.query(Order)
-        .filter(Order.user_id == user_id)
-        .order_by(Order.created_at.desc())
-        .all()
+    # Pages of orders are appended as the user scrolls near the end of the list
+    order_column = ft.ListView(
+        spacing=10,
+        expand=True,
+        on_scroll_interval=100,
+        on_scroll=lambda e: on_scroll(e)
     )
+    history_state = {"next": None, "loading": False}
+    history_lock = threading.Lock()
 
-    order_column = ft.Column(spacing=10, scroll=ft.ScrollMode.AUTO)
-
-    def reorder_items(order_id):
+    def reorder_items(order):
         from core.cart_service import add_to_cart
-        order_items = db.query(OrderItem).filter(OrderItem.order_id == order_id).all()
         added_count = 0
-        for i in order_items:
-            food = db.query(FoodItem).get(i.food_id)
+        for i in order["items"]:
+            food = get_catalog_item(i["food_id"])
             if food:
-                add_to_cart(db, user_id, food.id, quantity=i.quantity)
+                add_to_cart(db, user_id, food.id, quantity=i["quantity"])
                 added_count += 1
-        db.add(AuditLog(user_email=user_email, action=f"Reordered order #{order_id} ({added_count} items)"))
+        db.add(AuditLog(user_email=user_email, action=f"Reordered order #{order['id']} ({added_count} items)"))
         db.commit()
         update_cart_badge()
         page.snack_bar = ft.SnackBar(
@@ -44,7 +48,132 @@ def order_history_widget(page, on_nav, update_cart_badge):
         page.snack_bar.open = True
         page.update()
 
-    if not orders:
+    def build_item_row(i):
+        if i["name"] is not None:
+            food_image = i["image"]
+            return ft.Container(
+                content=ft.Row([
+                    ft.Container(
+                        content=ft.Image(
+                            src=thumbnail_for(food_image, THUMB_HISTORY),
+                            width=50,
+                            height=50,
+                            fit=ft.ImageFit.COVER,
+                            border_radius=8
+                        ) if asset_exists(food_image) else ft.Container(
+                            width=50,
+                            height=50,
+                            bgcolor="grey300",
+                            border_radius=8
+                        ),
+                        border=ft.border.all(1, "grey300"),
+                        border_radius=8
+                    ),
+                    ft.Column([
+                        ft.Text(i["name"], weight="bold", size=13, color="black"),
+                        ft.Text(f"₱{i['price']:.2f} × {i['quantity']}", size=11, color="grey700"),
+                    ], spacing=2, expand=True),
+                    ft.Text(f"₱{i['subtotal']:.2f}", size=13, weight="bold", color="green"),
+                ], spacing=8, alignment=ft.MainAxisAlignment.START),
+                padding=ft.padding.symmetric(horizontal=8, vertical=4)
+            )
+        return ft.Container(
+            content=ft.Row([
+                ft.Container(
+                    content=ft.Container(width=50, height=50, bgcolor="grey300", border_radius=8),
+                    border=ft.border.all(1, "grey300"),
+                    border_radius=8
+                ),
+                ft.Column([
+                    ft.Text("Deleted item", weight="bold", size=13, color="red"),
+                    ft.Text(f"Quantity: {i['quantity']}", size=11, color="grey700"),
+                ], spacing=2, expand=True),
+                ft.Text(f"₱{i['subtotal']:.2f}", size=13, weight="bold", color="grey"),
+            ], spacing=8, alignment=ft.MainAxisAlignment.START),
+            padding=ft.padding.symmetric(horizontal=8, vertical=4)
+        )
+
+    def build_order_card(order):
+        status = order["status"]
+        return ft.Container(
+            content=ft.Card(
+                content=ft.Container(
+                    content=ft.Column(
+                        [
+                            ft.Row([
+                                ft.Text(f"Order #{order['id']}", size=16, weight="bold", color="black"),
+                                ft.Container(
+                                    content=ft.Text(status, color="white", size=11, weight="bold"),
+                                    bgcolor="green" if status == "Completed" else "orange" if status == "Pending" else "red",
+                                    padding=ft.padding.symmetric(horizontal=8, vertical=4),
+                                    border_radius=5
+                                )
+                            ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+                            ft.Text(f"Date: {order['created_at'].strftime('%Y-%m-%d %H:%M')}", size=11, color="grey700"),
+                            ft.Divider(height=1),
+                            ft.Column([build_item_row(i) for i in order["items"]], spacing=4),
+                            ft.Divider(height=1),
+                            ft.Row(
+                                [
+                                    ft.Text(f"Total: ₱{order['total_price']:.2f}", weight="bold", size=16, color="black"),
+                                    ft.ElevatedButton(
+                                        "Reorder",
+                                        on_click=lambda e, o=order: reorder_items(o),
+                                        style=ft.ButtonStyle(
+                                            bgcolor="#FEB23F",
+                                            color="black",
+                                            shape=ft.RoundedRectangleBorder(radius=5)
+                                        ),
+                                        height=32,
+                                        width=90
+                                    )
+                                ],
+                                alignment=ft.MainAxisAlignment.SPACE_BETWEEN
+                            )
+                        ],
+                        spacing=8
+                    ),
+                    padding=12,
+                    bgcolor="white",
+                    border_radius=12
+                )
+            ),
+            padding=ft.padding.symmetric(horizontal=10)
+        )
+
+    # Shown under the last card while older orders remain (also loads them on tap,
+    # for when the first page is too short to scroll)
+    load_more = ft.Container(
+        content=ft.TextButton("Load older orders", on_click=lambda e: load_next_page()),
+        alignment=ft.alignment.center,
+        padding=10
+    )
+
+    def load_next_page():
+        with history_lock:
+            if history_state["loading"] or history_state["next"] is None:
+                return
+            history_state["loading"] = True
+        try:
+            append_page(get_order_page(db, user_id, after=history_state["next"]))
+        finally:
+            history_state["loading"] = False
+        page.update()
+
+    def append_page(result):
+        if load_more in order_column.controls:
+            order_column.controls.remove(load_more)
+        order_column.controls.extend(build_order_card(order) for order in result["orders"])
+        history_state["next"] = result["next"]
+        if result["next"] is not None:
+            order_column.controls.append(load_more)
+
+    def on_scroll(e):
+        if e.pixels >= e.max_scroll_extent - 400:
+            load_next_page()
+
+    first_page = get_order_page(db, user_id)
+    if not first_page["orders"]:
         order_column.controls.append(
             ft.Container(
                 content=ft.Column([
@@ -68,108 +197,7 @@ def order_history_widget(page, on_nav, update_cart_badge):
             )
         )
     else:
-        for order in orders:
-            items = db.query(OrderItem).filter(OrderItem.order_id == order.id).all()
-            item_rows = []
-            for i in items:
-                food = db.query(FoodItem).get(i.food_id)
-                if food:
-                    food_name = food.name
-                    food_image = food.image
-                    food_price = food.price
-                    item_rows.append(
-                        ft.Container(
-                            content=ft.Row([
-                                ft.Container(
-                                    content=ft.Image(
-                                        src=food_image,
-                                        width=50,
-                                        height=50,
-                                        fit=ft.ImageFit.COVER,
-                                        border_radius=8
-                                    ) if food_image and os.path.exists(food_image) else ft.Container(
-                                        width=50,
-                                        height=50,
-                                        bgcolor="grey300",
-                                        border_radius=8
-                                    ),
-                                    border=ft.border.all(1, "grey300"),
-                                    border_radius=8
-                                ),
-                                ft.Column([
-                                    ft.Text(food_name, weight="bold", size=13, color="black"),
-                                    ft.Text(f"₱{food_price:.2f} × {i.quantity}", size=11, color="grey700"),
-                                ], spacing=2, expand=True),
-                                ft.Text(f"₱{i.subtotal:.2f}", size=13, weight="bold", color="green"),
-                            ], spacing=8, alignment=ft.MainAxisAlignment.START),
-                            padding=ft.padding.symmetric(horizontal=8, vertical=4)
-                        )
-                    )
-                else:
-                    item_rows.append(
-                        ft.Container(
-                            content=ft.Row([
-                                ft.Container(
-                                    content=ft.Container(width=50, height=50, bgcolor="grey300", border_radius=8),
-                                    border=ft.border.all(1, "grey300"),
-                                    border_radius=8
-                                ),
-                                ft.Column([
-                                    ft.Text("Deleted item", weight="bold", size=13, color="red"),
-                                    ft.Text(f"Quantity: {i.quantity}", size=11, color="grey700"),
-                                ], spacing=2, expand=True),
-                                ft.Text(f"₱{i.subtotal:.2f}", size=13, weight="bold", color="grey"),
-                            ], spacing=8, alignment=ft.MainAxisAlignment.START),
-                            padding=ft.padding.symmetric(horizontal=8, vertical=4)
-                        )
-                    )
-            order_column.controls.append(
-                ft.Container(
-                    content=ft.Card(
-                        content=ft.Container(
-                            content=ft.Column(
-                                [
-                                    ft.Row([
-                                        ft.Text(f"Order #{order.id}", size=16, weight="bold", color="black"),
-                                        ft.Container(
-                                            content=ft.Text(order.status, color="white", size=11, weight="bold"),
-                                            bgcolor="green" if order.status == "Completed" else "orange" if order.status == "Pending" else "red",
-                                            padding=ft.padding.symmetric(horizontal=8, vertical=4),
-                                            border_radius=5
-                                        )
-                                    ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
-                                    ft.Text(f"Date: {order.created_at.strftime('%Y-%m-%d %H:%M')}", size=11, color="grey700"),
-                                    ft.Divider(height=1),
-                                    ft.Column(item_rows, spacing=4),
-                                    ft.Divider(height=1),
-                                    ft.Row(
-                                        [
-                                            ft.Text(f"Total: ₱{order.total_price:.2f}", weight="bold", size=16, color="black"),
-                                            ft.ElevatedButton(
-                                                "Reorder",
-                                                on_click=lambda e, oid=order.id: reorder_items(oid),
-                                                style=ft.ButtonStyle(
-                                                    bgcolor="#FEB23F",
-                                                    color="black",
-                                                    shape=ft.RoundedRectangleBorder(radius=5)
-                                                ),
-                                                height=32,
-                                                width=90
-                                            )
-                                        ],
-                                        alignment=ft.MainAxisAlignment.SPACE_BETWEEN
-                                    )
-                                ],
-                                spacing=8
-                            ),
-                            padding=12,
-                            bgcolor="white",
-                            border_radius=12
-                        )
-                    ),
-                    padding=ft.padding.symmetric(horizontal=10)
-                )
-            )
+        append_page(first_page)
 
     # Header (matches profile header style)
     header = ft.Container(
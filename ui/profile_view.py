@@ -1,13 +1,18 @@
-import os
 import flet as ft
-from core.db import SessionLocal
+from core.query_metrics import track_queries
+from core.session_registry import page_session
+from core.cart_buffer import flush_cart, unwatch_cart
+from core.image_service import thumbnail_for, make_thumbnails_async, THUMB_AVATAR
+from core.upload_store import store_upload, keep_upload, discard_upload, release_upload, PROFILE_UPLOAD_DIR
+from core.asset_manifest import asset_exists
 from core.profile_service import get_user_by_id, update_profile, change_password
 from models.order import Order
 from models.user import User
 from core.two_fa_ui_service import show_2fa_settings_dialog
 
+@track_queries
 def profile_view_widget(page, on_nav):
-    db = SessionLocal()
+    db = page_session(page, "profile")
 
     # Check session user
     user_data = page.session.get("user")
@@ -36,11 +41,11 @@ def profile_view_widget(page, on_nav):
 
     # Profile image (use placeholder if none)
     def get_profile_image():
-        profile_image_path = user.profile_picture if user.profile_picture and os.path.exists(user.profile_picture) else None
+        profile_image_path = user.profile_picture if asset_exists(user.profile_picture) else None
         
         if profile_image_path:
             return ft.Image(
-                src=profile_image_path,
+                src=thumbnail_for(profile_image_path, THUMB_AVATAR),
                 width=80,
                 height=80,
                 fit=ft.ImageFit.COVER,
@@ -158,17 +163,19 @@ def profile_view_widget(page, on_nav):
     # File picker for profile image
     def on_file_pick(e: ft.FilePickerResultEvent):
         if e.files:
-            import shutil
             src = e.files[0].path
-            upload_dir = "assets/profile_images"
-            os.makedirs(upload_dir, exist_ok=True)
-            filename = f"user_{user.id}_{os.path.basename(src)}"
-            dest = os.path.join(upload_dir, filename)
             
+            dest = None
             try:
-                shutil.copy(src, dest)
+                dest = store_upload(src, PROFILE_UPLOAD_DIR)
+                make_thumbnails_async(dest)
+                previous_picture = user.profile_picture
                 user.profile_picture = dest
                 db.commit()
+                keep_upload(dest)
+                dest = None
+                if previous_picture != user.profile_picture:
+                    release_upload(db, previous_picture)
                 page.snack_bar = ft.SnackBar(
                     ft.Text("Profile picture updated!"),
                     bgcolor=ft.Colors.GREEN
@@ -176,6 +183,9 @@ def profile_view_widget(page, on_nav):
                 page.snack_bar.open = True
                 build_ui()
             except Exception as ex:
+                if dest:  # stored but never saved
+                    db.rollback()
+                    discard_upload(db, dest)
                 page.snack_bar = ft.SnackBar(
                     ft.Text(f"❌ Error uploading image"),
                     bgcolor=ft.Colors.RED
@@ -300,6 +310,8 @@ def profile_view_widget(page, on_nav):
         build_ui()
 
     def logout_user(e):
+        flush_cart(user_data["id"])
+        unwatch_cart(user_data["id"])
         page.session.set("user", None)
         page.snack_bar = ft.SnackBar(ft.Text("You have been logged out."), open=True)
         page.go("/logout")
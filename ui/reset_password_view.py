@@ -1,11 +1,11 @@
 # ui/reset_password_view.py
 import flet as ft
-from core.db import SessionLocal
+from core.session_registry import page_session
 from core.auth_service import generate_reset_token, verify_reset_token
 
 def reset_password_view(page: ft.Page):
     page.title = "Reset Password - Pojangmacha"
-    db = SessionLocal()
+    db = page_session(page)
 
     email = ft.TextField(label="Email", width=300)
     token = ft.TextField(label="Reset Token", width=300)
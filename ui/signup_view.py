@@ -1,6 +1,6 @@
 import flet as ft
 import re
-from core.db import SessionLocal
+from core.session_registry import page_session, thread_session
 from core.auth_service import create_user_from_google
 from core.session_manager import start_session
 from core.google_auth import get_google_user_info
@@ -17,7 +17,7 @@ BUTTON_COLOR = "#FEB23F"
 
 def signup_view(page: ft.Page):
     page.title = "Sign Up - Pojangmacha"
-    db = SessionLocal()
+    db = page_session(page)
     MOBILE_WIDTH = 350
 
     # ===== INPUT FIELDS (MATCHING LOGIN DESIGN) =====
@@ -213,12 +213,13 @@ def signup_view(page: ft.Page):
                     page.update()
                     return
                 
-                user = create_user_from_google(
-                    db,
-                    email=user_info['email'],
-                    full_name=user_info.get('name', 'Google User'),
-                    picture=user_info.get('picture')
-                )
+                with thread_session() as thread_db:
+                    user = create_user_from_google(
+                        thread_db,
+                        email=user_info['email'],
+                        full_name=user_info.get('name', 'Google User'),
+                        picture=user_info.get('picture')
+                    )
                 
                 page.session.set("user", {
                     "id": user.id,